@@ -1,25 +1,51 @@
 from intermediate.ast import AstNode, Goto, Label
+from intermediate.compact_asl import CompactAsl
 
 
-def flatten_ast(node):
+def iter_flatten_ast(node):
     """
-    Flattens an AST into a list of instructions.
+    Flattens an AST into a sequence of instructions, which are generated lazily.
+
+    Labels come before their children and every other node comes after its children. The tree is walked with an
+    explicit stack, so arbitrarily deep trees can be flattened.
     :param node: the root node of the ast
-    :return: a flattened list of instructions
+    :return: a generator of instructions
     """
     def is_tree_item_before_children(tree):
         return isinstance(tree, Label)
 
-    assert isinstance(node, AstNode)
-    result = []
+    # Nodes still to be visited, as (node, whether its children have already been visited).
+    stack = [(node, False)]
+
+    while stack:
+        current, children_visited = stack.pop()
+        if children_visited:
+            yield current
+            continue
 
-    if is_tree_item_before_children(node):
-        result.append(node)
+        assert isinstance(current, AstNode)
 
-    for child_node in node.get_children():
-        result.extend(flatten_ast(child_node))
+        if is_tree_item_before_children(current):
+            yield current
+        else:
+            stack.append((current, True))
 
-    if not is_tree_item_before_children(node):
-        result.append(node)
+        stack.extend((child, False) for child in reversed(current.get_children()))
 
-    return result
+
+def flatten_ast(node):
+    """
+    Flattens an AST into a list of instructions.
+    :param node: the root node of the ast
+    :return: a flattened list of instructions
+    """
+    return list(iter_flatten_ast(node))
+
+
+def compact_flatten_ast(node):
+    """
+    Flattens an AST into a CompactAsl, which takes much less memory than a list of instructions.
+    :param node: the root node of the ast
+    :return: a CompactAsl of the flattened instructions
+    """
+    return CompactAsl(iter_flatten_ast(node))
@@ -1,4 +1,10 @@
 class AstNode(object):
+    # Plays can have millions of nodes, so they are kept small by having no instance dicts.
+    __slots__ = ()
+
+    # The attributes of the node which are needed to generate its code (i.e. everything but its children).
+    OPERANDS = ()
+
     def get_children(self):
         return []
 
@@ -7,11 +13,17 @@ class AstNode(object):
 
 
 class NoOp(AstNode):
+    __slots__ = ()
+    OPERANDS = ()
+
     def __str__(self):
         return "No-op"
 
 
 class Assign(AstNode):
+    __slots__ = ("var", "expr_tree", "dynamic")
+    OPERANDS = ("var", "dynamic")
+
     def __init__(self, var, expr_tree, dynamic=True):
         self.var = var
         self.expr_tree = expr_tree
@@ -25,6 +37,9 @@ class Assign(AstNode):
 
 
 class BinaryOperator(AstNode):
+    __slots__ = ("left", "op", "right")
+    OPERANDS = ("op",)
+
     def __init__(self, left, op, right):
         self.left = left
         self.op = op
@@ -38,6 +53,9 @@ class BinaryOperator(AstNode):
 
 
 class Value(AstNode):
+    __slots__ = ("value",)
+    OPERANDS = ("value",)
+
     def __init__(self, value):
         assert isinstance(value, int)
         self.value = value
@@ -47,6 +65,9 @@ class Value(AstNode):
 
 
 class DynamicValue(AstNode):
+    __slots__ = ("field",)
+    OPERANDS = ("field",)
+
     def __init__(self, field):
         assert isinstance(field, str)
         self.field = field
@@ -56,6 +77,9 @@ class DynamicValue(AstNode):
 
 
 class PrintVariable(AstNode):
+    __slots__ = ("field", "as_char")
+    OPERANDS = ("field", "as_char")
+
     def __init__(self, field, as_char=False):
         assert isinstance(field, str)
         self.field = field
@@ -66,6 +90,9 @@ class PrintVariable(AstNode):
 
 
 class InputVariable(AstNode):
+    __slots__ = ("field", "as_char")
+    OPERANDS = ("field", "as_char")
+
     def __init__(self, field, as_char=False):
         assert isinstance(field, str)
         self.field = field
@@ -76,6 +103,9 @@ class InputVariable(AstNode):
 
 
 class Goto(AstNode):
+    __slots__ = ("name",)
+    OPERANDS = ("name",)
+
     def __init__(self, name):
         self.name = name
 
@@ -84,6 +114,9 @@ class Goto(AstNode):
 
 
 class ConditionalGoto(AstNode):
+    __slots__ = ("name",)
+    OPERANDS = ("name",)
+
     def __init__(self, name):
         self.name = name
 
@@ -92,6 +125,9 @@ class ConditionalGoto(AstNode):
 
 
 class Label(AstNode):
+    __slots__ = ("name", "children")
+    OPERANDS = ("name",)
+
     def __init__(self, name, children):
         self.name = name
         self.children = children
@@ -104,6 +140,9 @@ class Label(AstNode):
 
 
 class Compare(AstNode):
+    __slots__ = ("var1", "var2")
+    OPERANDS = ("var1", "var2")
+
     def __init__(self, var1, var2):
         self.var1 = var1
         self.var2 = var2
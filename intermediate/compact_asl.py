@@ -0,0 +1,153 @@
+from array import array
+
+from intermediate import ast
+
+# How each type of node is recreated from its operands (see AstNode.OPERANDS), as (type, constructor(*operands)). The
+# opcode of a type is its index.
+_NODE_TYPES = [
+    (ast.NoOp, ast.NoOp),
+    (ast.Assign, lambda var, dynamic: ast.Assign(var, None, dynamic)),
+    (ast.BinaryOperator, lambda op: ast.BinaryOperator(None, op, None)),
+    (ast.Value, ast.Value),
+    (ast.DynamicValue, ast.DynamicValue),
+    (ast.PrintVariable, ast.PrintVariable),
+    (ast.InputVariable, ast.InputVariable),
+    (ast.Goto, ast.Goto),
+    (ast.ConditionalGoto, ast.ConditionalGoto),
+    (ast.Label, lambda name: ast.Label(name, [])),
+    (ast.Compare, ast.Compare),
+]
+
+# The type of node stored with each opcode (other than OBJECT).
+NODE_TYPES = [node_type for node_type, _ in _NODE_TYPES]
+
+_OPCODES = {node_type: opcode for opcode, node_type in enumerate(NODE_TYPES)}
+
+# Opcode of nodes which are kept as they are, with their index in CompactAsl.objects as the first operand.
+OBJECT = len(_NODE_TYPES)
+
+_STRING, _FLAG, _INT = range(3)
+
+# How each operand is stored: strings as their index in CompactAsl.strings, flags as 0 or 1 and ints as they are.
+_OPERAND_KINDS = {
+    "var": _STRING,
+    "op": _STRING,
+    "field": _STRING,
+    "name": _STRING,
+    "var1": _STRING,
+    "var2": _STRING,
+    "dynamic": _FLAG,
+    "as_char": _FLAG,
+    "value": _INT,
+}
+
+
+class CompactAsl(object):
+    """
+    An ASL stored as a struct of arrays: an array of opcodes, one for each type of node, and two arrays of integer
+    operands. Names are stored once, in a table of strings, and referred to by their index. This takes a fraction of
+    the memory of a list of nodes, which matters for very large plays.
+
+    The operands of a node are the attributes listed in its type's OPERANDS, of which there are at most two. Unused
+    operands are 0.
+
+    Iterating over it recreates the nodes one at a time. Builder.asl_dump reads the arrays directly instead (see
+    bind_operands), so that the nodes needn't be recreated. The nodes don't have children (Labels have none, and the
+    children of other nodes are None), since in an ASL these are separate items anyway. Nodes of any other type
+    (including subclasses of the ast types) and Values which don't fit in an int are kept as they are.
+    """
+
+    def __init__(self, nodes=()):
+        self.opcodes = array("B")
+        self.first_operands = array("i")
+        self.second_operands = array("i")
+        self.strings = []
+        self.objects = []
+        self._string_indexes = {}
+        self._constructors = [self.bind_operands(opcode, lambda _, *operands, constructor=constructor:
+                                                 constructor(*operands))
+                              for opcode, (_, constructor) in enumerate(_NODE_TYPES)]
+        self.extend(nodes)
+
+    def string_index(self, string):
+        """
+        The index of a string in the table of strings, which is added to it if necessary.
+        """
+        index = self._string_indexes.get(string)
+        if index is None:
+            index = self._string_indexes[string] = len(self.strings)
+            self.strings.append(string)
+        return index
+
+    def _encode(self, node):
+        """
+        The operands of a node, or None if they can't be stored.
+        """
+        operands = [0, 0]
+        for i, attribute in enumerate(type(node).OPERANDS):
+            value = getattr(node, attribute)
+            kind = _OPERAND_KINDS[attribute]
+            if kind == _STRING:
+                value = self.string_index(value)
+            elif kind == _FLAG:
+                value = int(bool(value))
+            elif not -2 ** 31 <= value < 2 ** 31:
+                return None
+            operands[i] = value
+        return operands
+
+    def _decoder(self, attribute):
+        kind = _OPERAND_KINDS[attribute]
+        if kind == _STRING:
+            return self.strings.__getitem__
+        return bool if kind == _FLAG else int
+
+    def bind_operands(self, opcode, function):
+        """
+        Adapts a function taking the operands of a type of node to take them as they are stored.
+        :param opcode: the opcode of the type of node (other than OBJECT)
+        :param function: a function(context, *operands)
+        :return: a function(context, first operand, second operand) as stored in the arrays, which calls function
+        """
+        decoders = [self._decoder(attribute) for attribute in NODE_TYPES[opcode].OPERANDS]
+        if len(decoders) == 0:
+            return lambda context, first, second: function(context)
+        if len(decoders) == 1:
+            decode_first = decoders[0]
+            return lambda context, first, second: function(context, decode_first(first))
+        decode_first, decode_second = decoders
+        return lambda context, first, second: function(context, decode_first(first), decode_second(second))
+
+    def append(self, node):
+        opcode = _OPCODES.get(type(node), OBJECT)
+        operands = self._encode(node) if opcode != OBJECT else None
+
+        if operands is None:
+            opcode, operands = OBJECT, (len(self.objects), 0)
+            self.objects.append(node)
+
+        self.opcodes.append(opcode)
+        self.first_operands.append(operands[0])
+        self.second_operands.append(operands[1])
+
+    def extend(self, nodes):
+        for node in nodes:
+            self.append(node)
+
+    def decode(self, opcode, first, second):
+        """
+        Recreates the node with the given opcode and operands.
+        """
+        if opcode == OBJECT:
+            return self.objects[first]
+        return self._constructors[opcode](None, first, second)
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def __getitem__(self, index):
+        return self.decode(self.opcodes[index], self.first_operands[index], self.second_operands[index])
+
+    def __iter__(self):
+        for opcode, first, second in zip(self.opcodes, self.first_operands, self.second_operands):
+            yield self.decode(opcode, first, second)
@@ -1,3 +1,4 @@
 class Operators(object):
     MULTIPLY = "*"
     ADD = "+"
+    SHIFT_LEFT = "<<"
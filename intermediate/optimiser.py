@@ -0,0 +1,125 @@
+from intermediate.ast import AstNode, Assign, BinaryOperator, Label, Value
+from intermediate.operators import Operators
+
+
+def _to_int32(value):
+    """
+    Wraps a value around to a signed 32 bit integer, as the JVM's integer arithmetic does.
+    """
+    return (value + 2 ** 31) % 2 ** 32 - 2 ** 31
+
+
+def _operands(node, op):
+    """
+    The operands of a chain of the same associative operator, in left to right order.
+    """
+    result = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, BinaryOperator) and node.op == op:
+            stack.append(node.right)
+            stack.append(node.left)
+        else:
+            result.append(node)
+    return result
+
+
+def _left_fold(nodes, op):
+    result = nodes[0]
+    for node in nodes[1:]:
+        result = BinaryOperator(result, op, node)
+    return result
+
+
+def _power_of_two_factor(value):
+    """
+    Splits a non-zero value into (odd, k) such that value == odd * 2 ** k.
+    """
+    k = 0
+    while value % 2 == 0:
+        value //= 2
+        k += 1
+    return value, k
+
+
+def _simplify_sum(node):
+    dynamic_terms = []
+    constants = []
+    for operand in _operands(node, Operators.ADD):
+        operand = simplify_expression(operand)
+        if isinstance(operand, Value):
+            constants.append(operand.value)
+        else:
+            dynamic_terms.append(operand)
+
+    total = _to_int32(sum(constants))
+
+    terms = dynamic_terms + ([Value(total)] if total != 0 else [])
+    if not terms:
+        return Value(0)
+    return _left_fold(terms, Operators.ADD)
+
+
+def _simplify_product(node):
+    dynamic_factors = []
+    constants = []
+    for operand in _operands(node, Operators.MULTIPLY):
+        operand = simplify_expression(operand)
+        if isinstance(operand, Value):
+            constants.append(operand.value)
+        else:
+            dynamic_factors.append(operand)
+
+    product = 1
+    for constant in constants:
+        product = _to_int32(product * constant)
+
+    if product == 0:
+        # Expressions have no side effects, so the dynamic factors needn't be evaluated.
+        return Value(0)
+
+    if not dynamic_factors:
+        return Value(product)
+
+    result = _left_fold(dynamic_factors, Operators.MULTIPLY)
+    if product == 1:
+        return result
+
+    odd, shift = _power_of_two_factor(product)
+    if odd == 1:
+        return BinaryOperator(result, Operators.SHIFT_LEFT, Value(shift))
+    return BinaryOperator(result, Operators.MULTIPLY, Value(product))
+
+
+def simplify_expression(node):
+    """
+    Simplifies an expression, doing as much of its arithmetic as possible at compile time.
+
+    Sums and products are reassociated so that all of their constant terms are combined, and multiplications by powers
+    of two become shifts. Arithmetic wraps around like the JVM's, so the result is unchanged.
+    """
+    if isinstance(node, BinaryOperator) and node.op == Operators.ADD:
+        return _simplify_sum(node)
+    if isinstance(node, BinaryOperator) and node.op == Operators.MULTIPLY:
+        return _simplify_product(node)
+    return node
+
+
+def fold_constants(node):
+    """
+    Simplifies the expression of every assignment in an AST. The tree is modified in place.
+    :param node: the root node of the ast
+    :return: the root node of the ast
+    """
+    assert isinstance(node, AstNode)
+
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, Assign):
+            current.expr_tree = simplify_expression(current.expr_tree)
+        elif isinstance(current, Label):
+            stack.extend(current.children)
+
+    return node
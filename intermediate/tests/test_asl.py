@@ -0,0 +1,50 @@
+import unittest
+
+from intermediate import ast
+from intermediate.asl import flatten_ast, iter_flatten_ast
+from intermediate.operators import Operators
+
+
+class AslTests(unittest.TestCase):
+
+    def test_GIVEN_labels_THEN_they_come_before_their_children_and_other_nodes_come_after_theirs(self):
+        value, field = ast.Value(1), ast.DynamicValue("romeo")
+        add = ast.BinaryOperator(value, Operators.ADD, field)
+        assign = ast.Assign("juliet", add)
+        goto = ast.Goto("scene")
+        scene = ast.Label("scene", [assign, goto])
+        play = ast.Label("play", [scene, ast.NoOp()])
+
+        flattened = flatten_ast(play)
+
+        self.assertEqual([id(node) for node in flattened],
+                         [id(node) for node in [play, scene, value, field, add, assign, goto, play.children[1]]])
+
+    def test_GIVEN_a_very_deep_tree_WHEN_flattening_THEN_it_does_not_hit_the_recursion_limit(self):
+        depth = 100000
+        expression = ast.Value(1)
+        for _ in range(depth):
+            expression = ast.BinaryOperator(ast.Value(1), Operators.ADD, expression)
+
+        flattened = flatten_ast(ast.Assign("romeo", expression))
+
+        self.assertEqual(len(flattened), 2 * depth + 2)
+        self.assertIs(flattened[-2], expression)
+
+    def test_GIVEN_a_tree_WHEN_iterating_over_it_flattened_THEN_nodes_are_generated_lazily(self):
+        first, second = ast.Label("first", []), ast.Label("second", [])
+        play = ast.Label("play", [first, second])
+
+        flattened = iter_flatten_ast(play)
+
+        self.assertIs(next(flattened), play)
+        second.children.append(ast.NoOp())
+        self.assertEqual(len(list(flattened)), 3)
+
+    def test_GIVEN_any_node_THEN_it_has_no_instance_dict(self):
+        nodes = [ast.NoOp(), ast.Assign("romeo", ast.Value(1)), ast.BinaryOperator(None, Operators.ADD, None),
+                 ast.Value(1), ast.DynamicValue("romeo"), ast.PrintVariable("romeo"), ast.InputVariable("romeo"),
+                 ast.Goto("scene"), ast.ConditionalGoto("scene"), ast.Label("scene", []), ast.Compare("a", "b")]
+
+        for node in nodes:
+            self.assertFalse(hasattr(node, "__dict__"), type(node))
@@ -0,0 +1,68 @@
+import unittest
+
+from intermediate import ast
+from intermediate.asl import compact_flatten_ast, flatten_ast
+from intermediate.compact_asl import CompactAsl
+from intermediate.operators import Operators
+
+
+class CustomNode(ast.Goto):
+    pass
+
+
+def _play():
+    add = ast.BinaryOperator(ast.Value(-3), Operators.ADD, ast.DynamicValue("romeo"))
+    scene = ast.Label("scene", [
+        ast.Assign("juliet", add),
+        ast.PrintVariable("juliet", as_char=True),
+        ast.InputVariable("romeo"),
+        ast.Compare("romeo", "juliet"),
+        ast.ConditionalGoto("scene"),
+        ast.Goto("scene"),
+        ast.NoOp(),
+    ])
+    return ast.Label("play", [ast.Assign("romeo", ast.Value(0), dynamic=False), scene])
+
+
+class CompactAslTests(unittest.TestCase):
+
+    def test_GIVEN_a_flattened_play_WHEN_stored_compactly_THEN_the_same_nodes_are_recreated(self):
+        play = _play()
+
+        compact = compact_flatten_ast(play)
+
+        self.assertEqual(len(compact), len(flatten_ast(play)))
+        self.assertEqual([type(node) for node in compact], [type(node) for node in flatten_ast(play)])
+        self.assertEqual([str(node) for node in compact if not isinstance(node, (ast.Assign, ast.BinaryOperator))],
+                         [str(node) for node in flatten_ast(play)
+                          if not isinstance(node, (ast.Assign, ast.BinaryOperator))])
+
+    def test_GIVEN_nodes_with_children_WHEN_stored_compactly_THEN_their_own_fields_are_kept(self):
+        assign, add = ast.Assign("romeo", None, dynamic=False), ast.BinaryOperator(None, Operators.MULTIPLY, None)
+
+        recreated_assign, recreated_add = CompactAsl([assign, add])
+
+        self.assertEqual((recreated_assign.var, recreated_assign.dynamic), ("romeo", False))
+        self.assertEqual(recreated_add.op, Operators.MULTIPLY)
+        self.assertEqual(recreated_assign.get_children(), [None])
+
+    def test_GIVEN_repeated_names_WHEN_stored_compactly_THEN_each_is_stored_once(self):
+        compact = CompactAsl(ast.DynamicValue("romeo") for _ in range(1000))
+
+        self.assertEqual(compact.strings, ["romeo"])
+        self.assertEqual(compact[999].field, "romeo")
+
+    def test_GIVEN_values_which_do_not_fit_an_int_WHEN_stored_compactly_THEN_they_are_kept_as_they_are(self):
+        values = [ast.Value(-2 ** 31), ast.Value(2 ** 31 - 1), ast.Value(2 ** 31), ast.Value(-2 ** 40)]
+
+        compact = CompactAsl(values)
+
+        self.assertEqual([node.value for node in compact], [node.value for node in values])
+        self.assertEqual(compact.objects, values[2:])
+
+    def test_GIVEN_node_of_another_type_WHEN_stored_compactly_THEN_it_is_kept_as_it_is(self):
+        node = CustomNode("scene")
+
+        compact = CompactAsl([ast.NoOp(), node])
+
+        self.assertIs(compact[1], node)
@@ -0,0 +1,144 @@
+import unittest
+
+from intermediate import ast
+from intermediate.operators import Operators
+from intermediate.optimiser import fold_constants, simplify_expression
+
+
+def _evaluate(node, variables):
+    """
+    Evaluates an expression as the JVM would, with 32 bit integer arithmetic.
+    """
+    if isinstance(node, ast.Value):
+        return node.value
+    if isinstance(node, ast.DynamicValue):
+        return variables[node.field]
+
+    left, right = _evaluate(node.left, variables), _evaluate(node.right, variables)
+    if node.op == Operators.ADD:
+        result = left + right
+    elif node.op == Operators.MULTIPLY:
+        result = left * right
+    else:
+        result = left << right
+    return (result + 2 ** 31) % 2 ** 32 - 2 ** 31
+
+
+def _adjectives(count, noun):
+    """
+    The expression the parser produces for e.g. "a big big cat", with count adjectives.
+    """
+    node = noun
+    for _ in range(count):
+        node = ast.BinaryOperator(ast.Value(2), Operators.MULTIPLY, node)
+    return node
+
+
+def _add(*nodes):
+    """
+    The right nested sum that the parser produces.
+    """
+    node = nodes[-1]
+    for left in reversed(nodes[:-1]):
+        node = ast.BinaryOperator(left, Operators.ADD, node)
+    return node
+
+
+def _count_nodes(node):
+    if isinstance(node, ast.BinaryOperator):
+        return 1 + _count_nodes(node.left) + _count_nodes(node.right)
+    return 1
+
+
+class OptimiserTests(unittest.TestCase):
+
+    def assertSameValue(self, expression, simplified, variables=None):
+        for values in variables or [{}]:
+            self.assertEqual(_evaluate(expression, values), _evaluate(simplified, values))
+
+    def test_GIVEN_constant_product_THEN_it_is_folded_to_a_value(self):
+        expression = _adjectives(3, ast.Value(-1))
+
+        simplified = simplify_expression(expression)
+
+        self.assertIsInstance(simplified, ast.Value)
+        self.assertEqual(simplified.value, -8)
+
+    def test_GIVEN_constant_sum_THEN_it_is_folded_to_a_value(self):
+        expression = _add(ast.Value(1), _adjectives(2, ast.Value(1)), ast.Value(-1))
+
+        simplified = simplify_expression(expression)
+
+        self.assertIsInstance(simplified, ast.Value)
+        self.assertEqual(simplified.value, 4)
+
+    def test_GIVEN_sum_of_constants_and_variables_THEN_constants_are_combined_into_one_term(self):
+        expression = _add(ast.Value(1), ast.DynamicValue("romeo"), ast.Value(2), ast.DynamicValue("juliet"),
+                          ast.Value(1))
+
+        simplified = simplify_expression(expression)
+
+        self.assertEqual(_count_nodes(simplified), 5)
+        self.assertSameValue(expression, simplified,
+                             [{"romeo": 3, "juliet": -10}, {"romeo": 2 ** 31 - 1, "juliet": 5}])
+
+    def test_GIVEN_constants_which_cancel_out_THEN_no_constant_is_added(self):
+        expression = _add(ast.Value(1), ast.DynamicValue("romeo"), ast.Value(-1))
+
+        simplified = simplify_expression(expression)
+
+        self.assertIsInstance(simplified, ast.DynamicValue)
+
+    def test_GIVEN_variable_multiplied_by_power_of_two_THEN_it_is_shifted(self):
+        expression = _adjectives(3, ast.DynamicValue("romeo"))
+
+        simplified = simplify_expression(expression)
+
+        self.assertEqual(str(simplified), "((field 'romeo') << (3))")
+
+    def test_GIVEN_variable_multiplied_by_negative_power_of_two_THEN_it_is_still_correct(self):
+        expression = ast.BinaryOperator(ast.Value(-1), Operators.MULTIPLY, _adjectives(2, ast.DynamicValue("romeo")))
+
+        simplified = simplify_expression(expression)
+
+        self.assertSameValue(expression, simplified, [{"romeo": 7}, {"romeo": -2 ** 31}])
+
+    def test_GIVEN_constant_product_larger_than_a_byte_THEN_it_is_folded_to_a_value(self):
+        expression = _adjectives(20, ast.Value(-1))
+
+        simplified = simplify_expression(expression)
+
+        self.assertIsInstance(simplified, ast.Value)
+        self.assertEqual(simplified.value, -2 ** 20)
+
+    def test_GIVEN_product_which_overflows_THEN_it_wraps_around_like_java(self):
+        for count in [31, 32, 40]:
+            expression = _adjectives(count, ast.Value(1))
+
+            self.assertSameValue(expression, simplify_expression(expression))
+
+    def test_GIVEN_long_sum_THEN_it_is_simplified_without_recursing_along_it(self):
+        terms = [ast.DynamicValue("romeo") if i % 2 else ast.Value(1) for i in range(5000)]
+        expression = _add(*terms)
+
+        simplified = simplify_expression(expression)
+
+        self.assertEqual(simplified.right.value, 2500)
+        dynamic_terms = 0
+        node = simplified.left
+        while isinstance(node, ast.BinaryOperator):
+            self.assertIsInstance(node.right, ast.DynamicValue)
+            dynamic_terms += 1
+            node = node.left
+        self.assertEqual(dynamic_terms + 1, 2500)
+
+    def test_GIVEN_play_WHEN_folding_constants_THEN_assignments_in_every_scene_are_simplified(self):
+        assign = ast.Assign("romeo", _adjectives(2, ast.Value(1)))
+        play = ast.Label("play", [ast.Assign("juliet", ast.Value(1), dynamic=False),
+                                  ast.Label("act i", [ast.Label("act i scene i", [assign, ast.NoOp()])])])
+
+        result = fold_constants(play)
+
+        self.assertIs(result, play)
+        self.assertIsInstance(assign.expr_tree, ast.Value)
+        self.assertEqual(assign.expr_tree.value, 4)
@@ -1,17 +1,32 @@
-from intermediate import ast, operators
-from java_class import access_modifiers, instructions
+from operator import attrgetter
+
+from intermediate import ast, compact_asl, operators
+from java_class import access_modifiers, instructions, peephole
 from java_class.java_class import JavaClass, InvalidClassError
-from java_class.instructions import goto_w, ifeq
+from java_class.stack_analysis import StackAnalysisError, frame_offsets
+from java_class.stack_map import StackMapFrame
 
 
 class CompilationError(Exception):
     pass
 
 
+def _node_emitter(emitter, operands):
+    """
+    Adapts an emitter taking the operands of a type of node to take the node itself.
+    """
+    if len(operands) == 0:
+        return lambda self, item: emitter(self)
+    get_operands = attrgetter(*operands)
+    if len(operands) == 1:
+        return lambda self, item: emitter(self, get_operands(item))
+    return lambda self, item: emitter(self, *get_operands(item))
+
+
 class Builder(object):
     """
     Builder class for a .class file. Contains methods for performing abstracted operations
-    (reading/writing from fields, invoking methods, etc).
+    (reading/writing variables, invoking methods, etc).
     """
 
     # Variable used to keep track of how many inputs have been "used up" from 'String[] args'.
@@ -20,66 +35,214 @@ class Builder(object):
     # Variable used to keep track of the result of the last conditional statement.
     CONDITIONAL = "$conditional"
 
+    # Local variable holding the buffered stream that output is written to, if output is buffered.
+    OUTPUT_STREAM = "$output_stream"
+
+    # Size of the buffer used for buffered output, in bytes.
+    OUTPUT_BUFFER_SIZE = 2 ** 16
+
+    # Local variable holding the reader that input is read from, if input is read from standard in.
+    INPUT_READER = "$input_reader"
+
     # Access modifier for all fields that this builder generates.
     FIELD_ACCESS_MODIFIERS = access_modifiers.PUBLIC | access_modifiers.STATIC
 
     # Access modifier for the main method that this builder generates
     MAIN_METHOD_ACCESS_MODIFIERS = access_modifiers.PUBLIC | access_modifiers.STATIC
 
-    def __init__(self, name):
+    # Descriptor of the main method that this builder generates
+    MAIN_METHOD_DESCRIPTOR = "([Ljava/lang/String;)V"
+
+    def __init__(self, name, use_static_fields=False, optimise=True, buffered_output=False, stdin_input=False):
         """
         This generates the stub of a valid java class file.
+
+        Variables (characters, and the builder's own variables such as INPUT_INDEX) are kept in local variables of
+        the main method, unless use_static_fields is True in which case they are kept in static fields of the class.
+
+        If optimise is True, shorter instruction sequences are used where possible and the code is passed through the
+        peephole optimiser.
+
+        If buffered_output is True, output is written to a buffer which is only flushed to standard out when it fills
+        up and at the end of the program, and characters are printed without a newline after each one.
+
+        Input is read from the program's arguments, one argument per input, unless stdin_input is True in which case it
+        is read from standard in: numbers one per line, and characters one at a time.
         """
         self.name = name
         self.output_class = JavaClass(name)
         self.code = []
 
-        self._set_field(Builder.INPUT_INDEX, 0)
-        self._set_field(Builder.CONDITIONAL, 0)
+        self.use_static_fields = use_static_fields
+        self.optimise = optimise
+        self.buffered_output = buffered_output
+        self.stdin_input = stdin_input
+
+        # Maps the name of each variable kept in a local variable of main to its index.
+        self.local_variables = {}
+        # Descriptor of the type of each of main's local variables, by index. Index 0 holds main's 'String[] args'.
+        self.local_variable_types = ["[Ljava/lang/String;"]
+
+        for variable in [Builder.CONDITIONAL] if self.stdin_input else [Builder.INPUT_INDEX, Builder.CONDITIONAL]:
+            if self.use_static_fields:
+                self._set_variable(variable, 0)
+            else:
+                self._local_variable_index(variable)
+
+        if self.buffered_output:
+            self._local_variable_index(Builder.OUTPUT_STREAM, "Ljava/io/PrintStream;")
+        if self.stdin_input:
+            self._local_variable_index(Builder.INPUT_READER, "Ljava/io/BufferedReader;")
 
     def build(self):
         """
         This methods performs final transformations before export.
         """
+        initialisers = []
+
+        if not self.use_static_fields:
+            # Like fields, every variable starts off as 0. This also means that every local variable has definitely
+            # been assigned before it is used, as the bytecode verifier requires.
+            for index, descriptor in enumerate(self.local_variable_types):
+                if descriptor == "I":
+                    initialisers.extend([instructions.bipush(0), instructions.istore(index)])
+
+        if self.buffered_output:
+            initialisers.extend(self._create_output_stream())
+            self._flush_output_stream()
+        if self.stdin_input:
+            initialisers.extend(self._create_input_reader())
+
         self.code.append(instructions.voidreturn())
+        self.code = initialisers + self.code
+
+        if self.optimise:
+            self.code = peephole.optimise(self.code)
 
         try:
             code = Builder._compute_gotos(self.code)
         except KeyError as e:
             raise CompilationError("Couldn't compute gotos because label '{}' was invalid.".format(e))
 
-        self.output_class.add_method("main", "([Ljava/lang/String;)V", Builder.MAIN_METHOD_ACCESS_MODIFIERS, code)
+        try:
+            self.output_class.add_method("main", Builder.MAIN_METHOD_DESCRIPTOR, Builder.MAIN_METHOD_ACCESS_MODIFIERS,
+                                         code, self._stack_map_frames(code))
+        except StackAnalysisError as e:
+            raise CompilationError("Generated code was invalid: {}".format(e))
 
         return self.output_class
 
-    @staticmethod
-    def _compute_gotos(code):
+    def _stack_map_frames(self, code):
+        """
+        Computes the stack map frames for main.
 
-        def length_of_code_up_to_instruction(num):
-            return sum(len(i) for i in code[0:num])
+        Jumps only ever go between statements, where the stack is empty, and every local variable is assigned before
+        the first statement, so every frame has the same types.
+        """
+        offsets = frame_offsets(b"".join(code), self.output_class.pool)
+        return [StackMapFrame(offset, self.local_variable_types, []) for offset in offsets]
 
+    @staticmethod
+    def _layout(code):
+        """
+        Computes the offset of every instruction in code, and the offset of every label.
+        """
+        offsets = []
         labels = {}
 
+        offset = 0
         for instruction in code:
+            offsets.append(offset)
             if isinstance(instruction, Label):
-                idx = code.index(instruction)
-                labels[instruction.name] = length_of_code_up_to_instruction(idx)
-                code[idx] = instructions.nop()
+                labels[instruction.name] = offset
+            offset += len(instruction)
 
-        for instruction in code:
-            if isinstance(instruction, Goto):
-                idx = code.index(instruction)
-                offset = labels[instruction.name] - length_of_code_up_to_instruction(idx)
-                code[idx] = ifeq(offset) if instruction.conditional else goto_w(offset)
+        return offsets, labels
+
+    @staticmethod
+    def _compute_gotos(code):
+        """
+        Replaces the Label and Goto placeholders in code with real instructions.
+
+        Gotos start off using the short (16 bit offset) form of their instructions. Any goto whose jump doesn't fit
+        is widened, which moves the instructions after it and may push other jumps out of range, so this is repeated
+        until every jump fits. Gotos are only ever widened, so this always terminates.
+        """
+        while True:
+            offsets, labels = Builder._layout(code)
+
+            widened = False
+            for instruction, offset in zip(code, offsets):
+                if isinstance(instruction, Goto) and not instruction.wide \
+                        and not Goto.fits_short_jump(labels[instruction.name] - offset):
+                    instruction.wide = True
+                    widened = True
+
+            if not widened:
+                break
+
+        result = []
+        for instruction, offset in zip(code, offsets):
+            if isinstance(instruction, Label):
+                if instruction.nop:
+                    result.append(instructions.nop())
+            elif isinstance(instruction, Goto):
+                result.extend(instruction.to_instructions(labels[instruction.name] - offset))
+            else:
+                result.append(instruction)
 
-        return code
+        return result
 
-    def _set_field(self, name, value):
+    def _local_variable_index(self, name, descriptor="I"):
         """
-        Sets a field with a constant value.
+        Gets the index of the local variable holding a variable, allocating one if it doesn't have one yet.
         """
-        self.code.append(instructions.bipush(value))
-        self._set_field_with_value_from_top_of_stack(name)
+        index = self.local_variables.get(name)
+        if index is None:
+            index = len(self.local_variable_types)
+            self.local_variables[name] = index
+            self.local_variable_types.append(descriptor)
+        return index
+
+    def _set_variable(self, name, value):
+        """
+        Sets a variable with a constant value.
+        """
+        self._push_constant(value)
+        self._set_variable_from_top_of_stack(name)
+
+    def _constant_instruction(self, value):
+        """
+        The shortest instruction which pushes an integer constant onto the stack.
+        """
+        if -2 ** 7 <= value < 2 ** 7:
+            return instructions.bipush(value)
+        elif -2 ** 15 <= value < 2 ** 15:
+            return instructions.sipush(value)
+        else:
+            index = self.output_class.pool.add_integer(value)
+            return instructions.ldc(index) if index < 2 ** 8 else instructions.ldc_w(index)
+
+    def _push_constant(self, value):
+        """
+        Pushes an integer constant onto the stack.
+        """
+        self.code.append(self._constant_instruction(value))
+
+    def _set_variable_from_top_of_stack(self, name):
+        """
+        Sets a variable to have the value at the top of the stack.
+        """
+        if self.use_static_fields:
+            self._set_field_with_value_from_top_of_stack(name)
+        else:
+            self.code.append(instructions.istore(self._local_variable_index(name)))
+
+    def _push_variable_onto_stack(self, name):
+        if self.use_static_fields:
+            self._push_field_value_onto_stack(name)
+        else:
+            self.code.append(instructions.iload(self._local_variable_index(name)))
 
     def _set_field_with_value_from_top_of_stack(self, name):
         """
@@ -90,19 +253,60 @@ class Builder(object):
 
         self.code.append(instructions.putstatic(field_ref))
 
+    def _create_output_stream(self):
+        """
+        The instructions to create a PrintStream which buffers output to standard out, without flushing after every
+        line, and store it in OUTPUT_STREAM.
+        """
+        pool = self.output_class.pool
+
+        return [
+            instructions.new(pool.add_class("java/io/PrintStream")),
+            instructions.dup(),
+            instructions.new(pool.add_class("java/io/BufferedOutputStream")),
+            instructions.dup(),
+            instructions.new(pool.add_class("java/io/FileOutputStream")),
+            instructions.dup(),
+            instructions.getstatic(pool.add_field_ref("java/io/FileDescriptor", "out", "Ljava/io/FileDescriptor;")),
+            instructions.invokespecial(
+                pool.add_method_ref("java/io/FileOutputStream", "<init>", "(Ljava/io/FileDescriptor;)V")),
+            self._constant_instruction(Builder.OUTPUT_BUFFER_SIZE),
+            instructions.invokespecial(
+                pool.add_method_ref("java/io/BufferedOutputStream", "<init>", "(Ljava/io/OutputStream;I)V")),
+            instructions.bipush(0),
+            instructions.invokespecial(
+                pool.add_method_ref("java/io/PrintStream", "<init>", "(Ljava/io/OutputStream;Z)V")),
+            instructions.astore(self.local_variables[Builder.OUTPUT_STREAM]),
+        ]
+
+    def _push_output_stream(self):
+        """
+        Pushes the PrintStream that output is written to onto the stack.
+        """
+        if self.buffered_output:
+            self.code.append(instructions.aload(self.local_variables[Builder.OUTPUT_STREAM]))
+        else:
+            printstream = self.output_class.pool.add_field_ref("java/lang/System", "out", "Ljava/io/PrintStream;")
+            self.code.append(instructions.getstatic(printstream))
+
+    def _flush_output_stream(self):
+        self._push_output_stream()
+        self.code.append(instructions.invokevirtual(
+            self.output_class.pool.add_method_ref("java/io/PrintStream", "flush", "()V")))
+
     def _integer_at_top_of_stack_to_sysout(self, as_char):
         """
         The integer at the top of the stack is popped and printed to standard out.
 
-        Formats as a character if as_char is True, otherwise formats as an integer.
+        Formats as a character if as_char is True, otherwise formats as an integer. Characters are followed by a
+        newline unless output is buffered.
         """
-        printstream = self.output_class.pool.add_field_ref("java/lang/System", "out", "Ljava/io/PrintStream;")
-        sysout = self.output_class.pool.add_method_ref("java/io/PrintStream", "println", "(C)V" if as_char else "(I)V")
+        print_method = "print" if as_char and self.buffered_output else "println"
+        sysout = self.output_class.pool.add_method_ref("java/io/PrintStream", print_method,
+                                                       "(C)V" if as_char else "(I)V")
 
-        self.code.extend([
-            instructions.getstatic(printstream),
-            instructions.swap(),
-        ])
+        self._push_output_stream()
+        self.code.append(instructions.swap())
 
         if as_char:
             self.code.append(instructions.i2c())
@@ -122,13 +326,55 @@ class Builder(object):
         field_ref = self.output_class.pool.add_field_ref(self.name, name, "I")
         self.code.append(instructions.getstatic(field_ref))
 
-    def _print_field(self, name, as_char):
-        self._push_field_value_onto_stack(name)
+    def _print_variable(self, name, as_char):
+        self._push_variable_onto_stack(name)
         self._integer_at_top_of_stack_to_sysout(as_char)
 
-    def _input_to_field(self, name, as_char):
+    def _create_input_reader(self):
+        """
+        The instructions to create a BufferedReader over standard in, and store it in INPUT_READER.
+        """
+        pool = self.output_class.pool
+
+        return [
+            instructions.new(pool.add_class("java/io/BufferedReader")),
+            instructions.dup(),
+            instructions.new(pool.add_class("java/io/InputStreamReader")),
+            instructions.dup(),
+            instructions.getstatic(pool.add_field_ref("java/lang/System", "in", "Ljava/io/InputStream;")),
+            instructions.invokespecial(
+                pool.add_method_ref("java/io/InputStreamReader", "<init>", "(Ljava/io/InputStream;)V")),
+            instructions.invokespecial(pool.add_method_ref("java/io/BufferedReader", "<init>", "(Ljava/io/Reader;)V")),
+            instructions.astore(self.local_variables[Builder.INPUT_READER]),
+        ]
+
+    def _input_from_stdin_to_variable(self, name, as_char):
+        """
+        Reads a character (or -1 at the end of the input), or a number on a line of its own, from standard in.
+        """
+        pool = self.output_class.pool
+        self.code.append(instructions.aload(self.local_variables[Builder.INPUT_READER]))
+
+        if as_char:
+            self.code.append(instructions.invokevirtual(pool.add_method_ref("java/io/BufferedReader", "read", "()I")))
+        else:
+            self.code.extend([
+                instructions.invokevirtual(
+                    pool.add_method_ref("java/io/BufferedReader", "readLine", "()Ljava/lang/String;")),
+                instructions.invokevirtual(pool.add_method_ref("java/lang/String", "trim", "()Ljava/lang/String;")),
+                instructions.invokestatic(
+                    pool.add_method_ref("java/lang/Integer", "parseInt", "(Ljava/lang/String;)I")),
+            ])
+
+        self._set_variable_from_top_of_stack(name)
+
+    def _input_to_variable(self, name, as_char):
+        if self.stdin_input:
+            self._input_from_stdin_to_variable(name, as_char)
+            return
+
         self.code.append(instructions.aload(0))
-        self._push_field_value_onto_stack(Builder.INPUT_INDEX)
+        self._push_variable_onto_stack(Builder.INPUT_INDEX)
 
         self.code.append(instructions.aaload())
 
@@ -140,10 +386,14 @@ class Builder(object):
             parse_int = self.output_class.pool.add_method_ref("java/lang/Integer", "parseInt", "(Ljava/lang/String;)I")
             self.code.append(instructions.invokestatic(parse_int))
 
-        self._set_field_with_value_from_top_of_stack(name)
-        self._increment_field(Builder.INPUT_INDEX)
+        self._set_variable_from_top_of_stack(name)
+        self._increment_variable(Builder.INPUT_INDEX)
+
+    def _increment_variable(self, name):
+        if not self.use_static_fields:
+            self.code.append(instructions.iinc(self._local_variable_index(name), 1))
+            return
 
-    def _increment_field(self, name):
         self._push_field_value_onto_stack(name)
         self.code.extend([
             instructions.bipush(1),
@@ -151,76 +401,180 @@ class Builder(object):
         ])
         self._set_field_with_value_from_top_of_stack(name)
 
-    def _add_operator_instruction_from_node(self, node):
+    def _add_operator_instruction(self, op):
         operator_mapping = {
             operators.Operators.ADD: instructions.iadd(),
             operators.Operators.MULTIPLY: instructions.imul(),
+            operators.Operators.SHIFT_LEFT: instructions.ishl(),
         }
         try:
-            self.code.append(operator_mapping[node.op])
+            self.code.append(operator_mapping[op])
         except KeyError:
-            raise CompilationError("No instruction specified to map {}".format(node.op))
-
-    def _compare(self, field1, field2):
-        self._push_field_value_onto_stack(field1)
+            raise CompilationError("No instruction specified to map {}".format(op))
+
+    def _compare(self, var1, var2):
+        if self.optimise:
+            # Conditional gotos only check whether CONDITIONAL is zero, and the difference of two ints is zero exactly
+            # when they are equal (even if it overflows), so there is no need to widen them to longs.
+            self._push_variable_onto_stack(var1)
+            self._push_variable_onto_stack(var2)
+            self.code.append(instructions.isub())
+            self._set_variable_from_top_of_stack(Builder.CONDITIONAL)
+            return
+
+        self._push_variable_onto_stack(var1)
         self.code.append(instructions.i2l())
-        self._push_field_value_onto_stack(field2)
+        self._push_variable_onto_stack(var2)
         self.code.append(instructions.i2l())
         self.code.append(instructions.lcmp())
-        self._set_field_with_value_from_top_of_stack(Builder.CONDITIONAL)
+        self._set_variable_from_top_of_stack(Builder.CONDITIONAL)
 
     def _add_conditional_goto(self, name):
-        self._push_field_value_onto_stack(Builder.CONDITIONAL)
+        self._push_variable_onto_stack(Builder.CONDITIONAL)
         self.code.append(Goto(name, True))
 
+    # How the code for each type of ASL node is generated, as {node type: emitter(builder, *operands)}, where the
+    # operands are the node's attributes listed in its type's OPERANDS. Emitters append the code for a node to
+    # builder.code. These are the single definition of each emitter: _emitters takes nodes, and is built from them.
+    _operand_emitters = {
+        ast.Goto: lambda self, name: self.code.append(Goto(name)),
+        ast.ConditionalGoto: lambda self, name: self._add_conditional_goto(name),
+        ast.Label: lambda self, name: self.code.append(Label(name, nop=not self.optimise)),
+        ast.BinaryOperator: lambda self, op: self._add_operator_instruction(op),
+        ast.Value: lambda self, value: self._push_constant(value),
+        ast.DynamicValue: lambda self, field: self._push_variable_onto_stack(field),
+        ast.Assign: lambda self, var, dynamic: self._set_variable_from_top_of_stack(var),
+        ast.PrintVariable: lambda self, field, as_char: self._print_variable(field, as_char),
+        ast.InputVariable: lambda self, field, as_char: self._input_to_variable(field, as_char),
+        ast.NoOp: lambda self: None,
+        ast.Compare: lambda self, var1, var2: self._compare(var1, var2),
+    }
+
+    # Emitters for each type of ASL node, as {node type: emitter(builder, node)}. Use register_emitter to add or
+    # replace emitters.
+    _emitters = {node_type: _node_emitter(emitter, node_type.OPERANDS)
+                 for node_type, emitter in _operand_emitters.items()}
+
+    @classmethod
+    def register_emitter(cls, node_type, emitter=None):
+        """
+        Registers the emitter for a type of ASL node, and its subclasses unless they have emitters of their own.
+
+        Emitters registered on a subclass of Builder only apply to that subclass (and its subclasses). Can be used as
+        a decorator, i.e. @MyBuilder.register_emitter(MyNode).
+        :param node_type: the type of ASL node
+        :param emitter: a function emitter(builder, node) which appends the code for a node to builder.code
+        """
+        if emitter is None:
+            def decorator(function):
+                cls.register_emitter(node_type, function)
+                return function
+            return decorator
+
+        if "_emitters" not in cls.__dict__:
+            cls._emitters = dict(cls._emitters)
+        cls._emitters[node_type] = emitter
+        _emitter_cache.clear()
+
+    @classmethod
+    def _emitter_for(cls, node_type):
+        """
+        The emitter for a type of ASL node, which is the one registered for the nearest class in its MRO, or None.
+        """
+        key = (cls, node_type)
+        if key not in _emitter_cache:
+            _emitter_cache[key] = next((cls._emitters[base] for base in node_type.__mro__ if base in cls._emitters),
+                                       None)
+        return _emitter_cache[key]
+
+    def _compact_asl_emitters(self, asl):
+        """
+        The emitter for each opcode of a CompactAsl, as a list of emitter(builder, first operand, second operand).
+        """
+        emitters = []
+        for opcode, node_type in enumerate(compact_asl.NODE_TYPES):
+            if self._emitter_for(node_type) is Builder._emitters[node_type]:
+                emitters.append(asl.bind_operands(opcode, Builder._operand_emitters[node_type]))
+            else:
+                # The emitter has been replaced, so it is given the node as usual.
+                emitters.append(lambda self, first, second, opcode=opcode:
+                                self.asl_dump([asl.decode(opcode, first, second)]))
+
+        # Nodes stored as objects are dumped as they are.
+        emitters.append(lambda self, first, second: self.asl_dump([asl.objects[first]]))
+        return emitters
+
     def asl_dump(self, asl):
+        if isinstance(asl, compact_asl.CompactAsl):
+            emitters = self._compact_asl_emitters(asl)
+            for opcode, first, second in zip(asl.opcodes, asl.first_operands, asl.second_operands):
+                emitters[opcode](self, first, second)
+            return self
 
-        mapping = {
-            ast.Goto: lambda: self.code.append(Goto(item.name)),
-            ast.ConditionalGoto: lambda: self._add_conditional_goto(item.name),
-            ast.Label: lambda: self.code.append(Label(item.name)),
-            ast.BinaryOperator: lambda: self._add_operator_instruction_from_node(item),
-            ast.Value: lambda: self.code.append(instructions.bipush(item.value)),
-            ast.DynamicValue: lambda: self._push_field_value_onto_stack(item.field),
-            ast.Assign: lambda: self._set_field_with_value_from_top_of_stack(item.var),
-            ast.PrintVariable: lambda: self._print_field(item.field, item.as_char),
-            ast.InputVariable: lambda: self._input_to_field(item.field, item.as_char),
-            ast.NoOp: lambda: None,
-            ast.Compare: lambda: self._compare(item.var1, item.var2),
-        }
+        emitters = {}
 
         for item in asl:
-            for node_type in mapping.keys():
-                if isinstance(item, node_type):
-                    mapping[node_type]()
-                    break
-            else:
-                raise CompilationError("No rule to map {}".format(item))
+            node_type = type(item)
+            emitter = emitters.get(node_type)
+            if emitter is None:
+                emitter = self._emitter_for(node_type)
+                if emitter is None:
+                    raise CompilationError("No rule to map {}".format(item))
+                emitters[node_type] = emitter
+            emitter(self, item)
 
         return self
 
 
+# Cache of the emitter for each (builder class, node type) pair, which is cleared whenever an emitter is registered.
+_emitter_cache = {}
+
+
 class Goto(object):
     """
     Placeholder instruction for GOTOs until they are computed.
+
+    A goto is short (goto or ifeq, with a 16 bit offset) unless it has been widened because its jump is too far for
+    a 16 bit offset. A wide unconditional goto is a goto_w. A wide conditional goto is a goto_w which is skipped over
+    by an ifne, since there is no wide form of ifeq.
     """
     def __init__(self, name, conditional=False):
         self.name = name
         self.conditional = conditional
+        self.wide = False
+
+    @staticmethod
+    def fits_short_jump(offset):
+        return -2**15 <= offset < 2**15
+
+    def to_instructions(self, offset):
+        """
+        The instructions for this goto, where offset is the jump from the start of this goto to its label.
+        """
+        if not self.wide:
+            return [instructions.ifeq(offset) if self.conditional else instructions.goto(offset)]
+        elif not self.conditional:
+            return [instructions.goto_w(offset)]
+        else:
+            skip = instructions.ifne(0)
+            return [instructions.ifne(len(skip) + len(instructions.goto_w(0))), instructions.goto_w(offset - len(skip))]
 
     def __len__(self):
-        return len(instructions.ifeq(0) if self.conditional else instructions.goto_w(0))
+        return sum(len(instruction) for instruction in self.to_instructions(0))
 
 
 class Label(object):
     """
     Placeholder instruction for GOTO jump points until they are computed and replaced with NOOPs.
+
+    If nop is False the label is removed instead, so jumps to it go straight to the instruction after it.
     """
-    def __init__(self, name):
+    def __init__(self, name, nop=True):
         self.name = name
+        self.nop = nop
 
     def __len__(self):
-        return len(instructions.nop())
+        return len(instructions.nop()) if self.nop else 0
 
     def __eq__(self, other):
         if not isinstance(other, Label):
@@ -1,20 +1,54 @@
-def str_to_byte(text):
+import struct
+from functools import lru_cache
+
+# Every 1 byte unsigned int, so that u1 doesn't need to convert anything.
+_U1_BYTES = tuple(bytes([i]) for i in range(2**8))
+
+_U2 = struct.Struct(">H").pack
+_U4 = struct.Struct(">I").pack
+_S1 = struct.Struct(">b").pack
+_S2 = struct.Struct(">h").pack
+_S4 = struct.Struct(">i").pack
+
+
+def _utf16_code_units(text):
     """
-    Converts a string to it's byte representation (1 byte per character)
-    :param text: The input string
-    :return: The string converted to bytes
+    The UTF-16 code units of a string, as one character strings.
+
+    On narrow builds of Python (e.g. 3.2 on Windows) characters outside the basic multilingual plane are already
+    stored as surrogate pairs. On other builds they are single characters (with codes above 0xFFFF), which are split
+    into their surrogate pairs here.
     """
-    result = bytes()
     for char in text:
-        b = ord(char)
+        code = ord(char)
+        if code > 0xFFFF:
+            code -= 0x10000
+            yield chr(0xD800 + (code >> 10))
+            yield chr(0xDC00 + (code & 0x3FF))
+        else:
+            yield char
 
-        # See https://docs.oracle.com/javase/specs/jvms/se7/html/jvms-4.html#jvms-4.4.7
-        # These characters are allowed in principle but have some special handling which has not been implemented.
-        if b == 0 or 0xF0 <= b <= 0xFF:
-            raise ValueError("The character with code {} is not allowed".format(b))
 
-        result += u1(b)
-    return result
+@lru_cache(maxsize=4096)
+def modified_utf8(text):
+    """
+    Encodes a string in the modified UTF-8 used by class files. This differs from standard UTF-8 in that the null
+    character is encoded as two bytes, and characters outside the basic multilingual plane are encoded as the two
+    characters of their UTF-16 surrogate pair, taking three bytes each. See
+    https://docs.oracle.com/javase/specs/jvms/se8/html/jvms-4.html#jvms-4.4.7
+
+    Results are cached, since the same names are encoded over and over again.
+    :param text: The input string
+    :return: The string converted to bytes
+    """
+    try:
+        result = text.encode("ascii")
+    except UnicodeEncodeError:
+        # Code units are encoded one at a time, as encoding a whole surrogate pair would combine it into the standard
+        # 4 byte encoding of the character.
+        result = b"".join(unit.encode("utf-8", "surrogatepass") for unit in _utf16_code_units(text))
+
+    return result.replace(b"\x00", b"\xC0\x80")
 
 
 def int_to_bytes(i, length, signed):
@@ -32,10 +66,19 @@ def int_to_bytes(i, length, signed):
     return int(i).to_bytes(length, 'big', signed=signed)
 
 
+# The converters below use precompiled structs (or a table, for u1) for speed. Anything they can't convert is passed on
+# to int_to_bytes, which converts it in the same way or raises the same error as before.
+
+
 def u1(i):
     """
     1 byte unsigned int
     """
+    try:
+        if i >= 0:
+            return _U1_BYTES[i]
+    except (IndexError, TypeError):
+        pass
     return int_to_bytes(i, 1, False)
 
 
@@ -43,32 +86,47 @@ def u2(i):
     """
     2 byte unsigned int
     """
-    return int_to_bytes(i, 2, False)
+    try:
+        return _U2(i)
+    except struct.error:
+        return int_to_bytes(i, 2, False)
 
 
 def u4(i):
     """
     4 byte unsigned int
     """
-    return int_to_bytes(i, 4, False)
+    try:
+        return _U4(i)
+    except struct.error:
+        return int_to_bytes(i, 4, False)
 
 
 def s1(i):
     """
     1 byte signed int
     """
-    return int_to_bytes(i, 1, True)
+    try:
+        return _S1(i)
+    except struct.error:
+        return int_to_bytes(i, 1, True)
 
 
 def s2(i):
     """
     2 byte signed int
     """
-    return int_to_bytes(i, 2, True)
+    try:
+        return _S2(i)
+    except struct.error:
+        return int_to_bytes(i, 2, True)
 
 
 def s4(i):
     """
     4 byte signed int
     """
-    return int_to_bytes(i, 4, True)
+    try:
+        return _S4(i)
+    except struct.error:
+        return int_to_bytes(i, 4, True)
@@ -1,4 +1,4 @@
-from java_class.constant_pool_entry import utf8, class_ref, name_and_type, method_ref, field_ref
+from java_class.constant_pool_entry import utf8, class_ref, name_and_type, method_ref, field_ref, integer
 
 
 class ConstantPool(object):
@@ -7,6 +7,8 @@ class ConstantPool(object):
     """
     def __init__(self):
         self._pool = []
+        self._indices = {}  # Maps each entry to its (1-based) index in the pool.
+        self._refs = {}  # Maps (ref type, defining class, name, type) to the index of a field or method ref.
 
         self.this_index = None
         self.this_utf8_index = None
@@ -21,11 +23,12 @@ class ConstantPool(object):
 
         This ensures that there aren't duplicated entries in the constant pool.
         """
-        if entry in self._pool:
-            return self._pool.index(entry) + 1
-
-        self._pool.append(entry)
-        return len(self._pool)
+        index = self._indices.get(entry)
+        if index is None:
+            self._pool.append(entry)
+            index = len(self._pool)
+            self._indices[entry] = index
+        return index
 
     def __iter__(self):
         return self._pool.__iter__()
@@ -33,15 +36,38 @@ class ConstantPool(object):
     def __len__(self):
         return len(self._pool)
 
+    def __getitem__(self, index):
+        """
+        Gets the entry at a (1-based) index.
+        """
+        if index < 1:
+            raise IndexError("Constant pool indices start at 1 (got {}).".format(index))
+        return self._pool[index - 1]
+
+    def __contains__(self, entry):
+        return entry in self._indices
+
+    def add_class(self, name):
+        return self.get_index(class_ref(self.get_index(utf8(name))))
+
+    def _add_ref(self, ref, defining_class, name, type):
+        key = (ref, defining_class, name, type)
+        index = self._refs.get(key)
+        if index is None:
+            defining_class_index = self.add_class(defining_class)
+            name_and_type_index = self.get_index(name_and_type(self.get_index(utf8(name)), self.get_index(utf8(type))))
+            index = self.get_index(ref(defining_class_index, name_and_type_index))
+            self._refs[key] = index
+        return index
+
     def add_method_ref(self, defining_class, name, type):
-        defining_class_index = self.get_index(class_ref(self.get_index(utf8(defining_class))))
-        name_and_type_index = self.get_index(name_and_type(self.get_index(utf8(name)), self.get_index(utf8(type))))
-        return self.get_index(method_ref(defining_class_index, name_and_type_index))
+        return self._add_ref(method_ref, defining_class, name, type)
 
     def add_field_ref(self, defining_class, name, type):
-        defining_class_index = self.get_index(class_ref(self.get_index(utf8(defining_class))))
-        name_and_type_index = self.get_index(name_and_type(self.get_index(utf8(name)), self.get_index(utf8(type))))
-        return self.get_index(field_ref(defining_class_index, name_and_type_index))
+        return self._add_ref(field_ref, defining_class, name, type)
+
+    def add_integer(self, value):
+        return self.get_index(integer(value))
 
     @staticmethod
     def generate_default(this_class, super_class="java/lang/Object"):
@@ -1,4 +1,4 @@
-from java_class.byte_utils import str_to_byte, u1, u2
+from java_class.byte_utils import modified_utf8, u1, u2, s4
 
 """
 Constant pool entry types as given in the java class file documentation.
@@ -37,9 +37,10 @@ def field_ref(class_index, name_and_type_index):
 
 
 def utf8(text):
+    encoded = modified_utf8(text)
     return u1(id_Utf8) \
-           + u2(len(text)) \
-           + str_to_byte(text)
+           + u2(len(encoded)) \
+           + encoded
 
 
 def name_and_type(name_index, descriptor_index):
@@ -51,3 +52,8 @@ def name_and_type(name_index, descriptor_index):
 def string(utf8str):
     return u1(id_String) \
            + u2(utf8str)
+
+
+def integer(value):
+    return u1(id_Integer) \
+           + s4(value)
@@ -27,57 +27,76 @@ class Exporter(object):
 
         filename = os.path.join(output_dir, "{}.class".format(self.output_class.name))
 
+        contents = self.export_to_bytes()
         with open(filename, "w+b") as f:
-            self._write(f)
+            f.write(contents)
+
+    def export_to_bytes(self):
+        """
+        The contents of the .java_class file, in the order specified by the specification.
+
+        The parts of the file are collected and joined once at the end, rather than written out one by one.
+        """
+        parts = []
 
-    def _write(self, stream):
         # Java java_class file header (constant bytes + versions).
-        stream.write(u4(Exporter.JAVA_FILE_HEADER))
-        stream.write(u2(self.output_class.version[1]))
-        stream.write(u2(self.output_class.version[0]))
+        parts.append(u4(Exporter.JAVA_FILE_HEADER))
+        parts.append(u2(self.output_class.version[1]))
+        parts.append(u2(self.output_class.version[0]))
 
         # Pool table
-        stream.write(u2(len(self.output_class.pool) + 1))
-        for entry in self.output_class.pool:
-            stream.write(entry)
+        parts.append(u2(len(self.output_class.pool) + 1))
+        parts.extend(self.output_class.pool)
 
         # Access modifiers
-        stream.write(u2(reduce(operator.xor, self.output_class.access_modifiers)))
+        parts.append(u2(reduce(operator.xor, self.output_class.access_modifiers)))
 
         # "This" and "Super" classes
-        stream.write(u2(self.output_class.pool.this_index))
-        stream.write(u2(self.output_class.pool.super_index))
+        parts.append(u2(self.output_class.pool.this_index))
+        parts.append(u2(self.output_class.pool.super_index))
 
         # Interface table (not implemented)
-        stream.write(u2(0))
+        parts.append(u2(0))
 
         # Field table
-        stream.write(u2(len(self.output_class.fields)))
+        parts.append(u2(len(self.output_class.fields)))
         for field in self.output_class.fields:
-            stream.write(u2(field.access_flags))
-            stream.write(u2(field.name_index))
-            stream.write(u2(field.descriptor_index))
-            stream.write(u2(0))  # Writing fields with attributes has not been implemented.
+            parts.append(u2(field.access_flags))
+            parts.append(u2(field.name_index))
+            parts.append(u2(field.descriptor_index))
+            parts.append(u2(0))  # Writing fields with attributes has not been implemented.
 
         # Methods table
-        stream.write(u2(len(self.output_class.methods)))
+        parts.append(u2(len(self.output_class.methods)))
         for name_index, descriptor_index, access_flags, attributes in self.output_class.methods:
-            stream.write(u2(access_flags))
-            stream.write(u2(name_index))
-            stream.write(u2(descriptor_index))
-            stream.write(u2(len(attributes)))
+            parts.append(u2(access_flags))
+            parts.append(u2(name_index))
+            parts.append(u2(descriptor_index))
+            parts.append(u2(len(attributes)))
 
             # Attributes table within method table (e.g. contains "Code" attribute)
             for attribute in attributes:
-                stream.write(u2(attribute["code_attribute_index"]))
-                stream.write(u4(12 + attribute["code_length"]))
-                stream.write(u2(attribute["max_stack"]))
-                stream.write(u2(attribute["max_locals"]))
-                stream.write(u4(attribute["code_length"]))
-                for instruction in attribute["instructions"]:
-                    stream.write(instruction)
-                stream.write(u2(0))  # Exception table not implemented
-                stream.write(u2(0))  # Attributes of attributes not implemented
+                # Attributes of the code attribute, as (name index, body) pairs. Class versions before 50 don't have
+                # stack map tables.
+                code_attributes = []
+                if attribute["stack_map_table"] is not None and self.output_class.version[0] >= 50:
+                    code_attributes.append((attribute["stack_map_table_index"], attribute["stack_map_table"]))
+
+                parts.append(u2(attribute["code_attribute_index"]))
+                parts.append(u4(12 + attribute["code_length"] + sum(6 + len(body) for _, body in code_attributes)))
+                parts.append(u2(attribute["max_stack"]))
+                parts.append(u2(attribute["max_locals"]))
+                parts.append(u4(attribute["code_length"]))
+                parts.extend(attribute["instructions"])
+                parts.append(u2(0))  # Exception table not implemented
+
+                parts.append(u2(len(code_attributes)))
+                for name_index, body in code_attributes:
+                    parts.append(u2(name_index))
+                    parts.append(u4(len(body)))
+                    parts.append(body)
 
         # Attributes table (not implemented)
-        stream.write(u2(0))
+        parts.append(u2(0))
+
+        return b"".join(parts)
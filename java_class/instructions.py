@@ -13,23 +13,29 @@ def ldc(const_index):
     return u1(0x12) + u1(const_index)
 
 
+def ldc_w(const_index):
+    return u1(0x13) + u2(const_index)
+
+
 def invokevirtual(method):
     return u1(0xB6) + u2(method)
 
 
 def bipush(value):
-    if value == -1:
-        return u1(0x2)  # iconst_m1
-    elif value == 0:
-        return u1(0x3)  # iconst_0
-    elif value == 1:
-        return u1(0x4)  # iconst_1
-    elif value == 2:
-        return u1(0x5)  # iconst_2
+    if -1 <= value <= 5:
+        return u1(0x3 + value)  # iconst_m1 to iconst_5
     else:
         return u1(0x10) + s1(value)
 
 
+def sipush(value):
+    return u1(0x11) + s2(value)
+
+
+def dup():
+    return u1(0x59)
+
+
 def swap():
     return u1(0x5F)
 
@@ -38,10 +44,18 @@ def iadd():
     return u1(0x60)
 
 
+def isub():
+    return u1(0x64)
+
+
 def imul():
     return u1(0x68)
 
 
+def ishl():
+    return u1(0x78)
+
+
 def putfield(ref):
     return u1(0xB5) + u2(ref)
 
@@ -71,6 +85,60 @@ def aload(idx):
         return u1(0x19) + u1(idx)
 
 
+def astore(idx):
+    if idx == 0:
+        return u1(0x4B)  # astore_0
+    elif idx == 1:
+        return u1(0x4C)  # astore_1
+    elif idx == 2:
+        return u1(0x4D)  # astore_2
+    elif idx == 3:
+        return u1(0x4E)  # astore_3
+    else:
+        return u1(0x3A) + u1(idx)
+
+
+def iload(idx):
+    if idx == 0:
+        return u1(0x1A)  # iload_0
+    elif idx == 1:
+        return u1(0x1B)  # iload_1
+    elif idx == 2:
+        return u1(0x1C)  # iload_2
+    elif idx == 3:
+        return u1(0x1D)  # iload_3
+    elif idx > 0xFF:
+        return wide() + u1(0x15) + u2(idx)
+    else:
+        return u1(0x15) + u1(idx)
+
+
+def istore(idx):
+    if idx == 0:
+        return u1(0x3B)  # istore_0
+    elif idx == 1:
+        return u1(0x3C)  # istore_1
+    elif idx == 2:
+        return u1(0x3D)  # istore_2
+    elif idx == 3:
+        return u1(0x3E)  # istore_3
+    elif idx > 0xFF:
+        return wide() + u1(0x36) + u2(idx)
+    else:
+        return u1(0x36) + u1(idx)
+
+
+def iinc(idx, const):
+    if idx > 0xFF or not -0x80 <= const <= 0x7F:
+        return wide() + u1(0x84) + u2(idx) + s2(const)
+    else:
+        return u1(0x84) + u1(idx) + s1(const)
+
+
+def wide():
+    return u1(0xC4)
+
+
 def aaload():
     return u1(0x32)
 
@@ -79,6 +147,18 @@ def invokestatic(ref):
     return u1(0xB8) + u2(ref)
 
 
+def invokespecial(ref):
+    return u1(0xB7) + u2(ref)
+
+
+def new(class_index):
+    return u1(0xBB) + u2(class_index)
+
+
+def goto(offset):
+    return u1(0xA7) + s2(offset)
+
+
 def goto_w(offset):
     return u1(0xC8) + s4(offset)
 
@@ -87,6 +167,10 @@ def ifeq(offset):
     return u1(0x99) + s2(offset)
 
 
+def ifne(offset):
+    return u1(0x9A) + s2(offset)
+
+
 def nop():
     return u1(0)
 
@@ -1,6 +1,8 @@
 from java_class import access_modifiers
 from java_class.constant_pool import ConstantPool
 from java_class.constant_pool_entry import utf8
+from java_class.stack_analysis import analyse, parse_method_descriptor
+from java_class.stack_map import encode_stack_map_table
 
 
 class InvalidClassError(Exception):
@@ -14,6 +16,7 @@ class JavaClass(object):
         self.pool = ConstantPool.generate_default(name)
         self.methods = []
         self.fields = []
+        self._field_keys = set()  # (name index, descriptor index) of each field, for fast duplicate checks.
 
         self.access_modifiers = [access_modifiers.PUBLIC, access_modifiers.SUPER]
         self.version = None
@@ -21,16 +24,32 @@ class JavaClass(object):
     def set_version(self, major, minor=0):
         self.version = (major, minor)
 
-    def add_method(self, name, descriptor, access_flags, instructions):
+    def add_method(self, name, descriptor, access_flags, instructions, stack_map_frames=None):
+        """
+        Adds a method with the given code to the class.
+
+        If stack_map_frames (a list of StackMapFrame) is given, the code gets a StackMapTable attribute so that it can
+        be checked by the type checking bytecode verifier. This is only exported for class versions 50 and above.
+        :raises: StackAnalysisError if the code's stack usage is invalid.
+        """
+        static = bool(access_flags & access_modifiers.STATIC)
+        max_stack, max_locals = analyse(b"".join(instructions), self.pool, descriptor, static)
 
         attributes = [{
             "code_attribute_index": self.pool.get_index(utf8("Code")),
             "instructions": instructions,
             "code_length": sum(len(instruction) for instruction in instructions),
-            "max_locals": 32768,
-            "max_stack": 32768,
+            "max_locals": max_locals,
+            "max_stack": max_stack,
+            "stack_map_table_index": None,
+            "stack_map_table": None,
         }]
 
+        if stack_map_frames is not None:
+            initial_locals = ([] if static else ["L{};".format(self.name)]) + parse_method_descriptor(descriptor)[0]
+            attributes[0]["stack_map_table_index"] = self.pool.get_index(utf8("StackMapTable"))
+            attributes[0]["stack_map_table"] = encode_stack_map_table(self.pool, initial_locals, stack_map_frames)
+
         name_index = self.pool.get_index(utf8(name))
         descriptor_index = self.pool.get_index(utf8(descriptor))
         self.methods.append((name_index, descriptor_index, access_flags, attributes))
@@ -42,11 +61,11 @@ class JavaClass(object):
         name_index = self.pool.get_index(utf8(name))
         descriptor_index = self.pool.get_index(utf8(descriptor))
 
-        field = Field(name_index, descriptor_index, access_flags)
-        if field in self.fields:
+        if (name_index, descriptor_index) in self._field_keys:
             return
 
-        self.fields.append(field)
+        self._field_keys.add((name_index, descriptor_index))
+        self.fields.append(Field(name_index, descriptor_index, access_flags))
 
     def check_valid(self):
         """
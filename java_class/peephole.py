@@ -0,0 +1,133 @@
+from java_class import instructions
+
+"""
+A peephole optimiser for the code produced by Builder, i.e. a list of instructions (as bytes) mixed with Goto and
+Label placeholders. Patterns never match across a placeholder, so no jump can land in the middle of one.
+"""
+
+ILOAD, ILOAD_0 = 0x15, 0x1A
+ISTORE, ISTORE_0 = 0x36, 0x3B
+ICONST_M1, ICONST_5, BIPUSH, SIPUSH = 0x02, 0x08, 0x10, 0x11
+GETSTATIC, PUTSTATIC = 0xB2, 0xB3
+WIDE = 0xC4
+
+
+def _is_instruction(instruction):
+    return isinstance(instruction, bytes)
+
+
+def _local_variable_index(instruction, opcode, opcode_0):
+    """
+    The local variable index of an instruction which is a form of opcode (where opcode_0 is its form for index 0), or
+    None if it isn't.
+    """
+    if len(instruction) == 1 and opcode_0 <= instruction[0] <= opcode_0 + 3:
+        return instruction[0] - opcode_0
+    if len(instruction) == 2 and instruction[0] == opcode:
+        return instruction[1]
+    if len(instruction) == 4 and instruction[0] == WIDE and instruction[1] == opcode:
+        return int.from_bytes(instruction[2:], "big")
+    return None
+
+
+def _load_for_store(instruction):
+    """
+    The instruction loading the variable which a store instruction stores to, or None for other instructions.
+    """
+    if instruction[0] == PUTSTATIC:
+        return bytes([GETSTATIC]) + instruction[1:]
+
+    index = _local_variable_index(instruction, ISTORE, ISTORE_0)
+    if index is not None:
+        return instructions.iload(index)
+
+    return None
+
+
+def _constant(instruction):
+    """
+    The value an instruction pushes if it pushes an integer constant, otherwise None.
+    """
+    opcode = instruction[0]
+    if ICONST_M1 <= opcode <= ICONST_5:
+        return opcode - 0x3
+    if opcode in (BIPUSH, SIPUSH):
+        return int.from_bytes(instruction[1:], "big", signed=True)
+    return None
+
+
+def _increment(window):
+    """
+    iload n; push k; iadd; istore n (or push k; iload n; ...) becomes iinc n k.
+    """
+    if len(window) < 4 or window[2] != instructions.iadd():
+        return None
+
+    for load, push in [(window[0], window[1]), (window[1], window[0])]:
+        index = _local_variable_index(load, ILOAD, ILOAD_0)
+        constant = _constant(push)
+        if index is not None and constant is not None and -2 ** 15 <= constant < 2 ** 15 \
+                and window[3] == instructions.istore(index):
+            return [instructions.iinc(index, constant)], 4
+
+    return None
+
+
+def _store_then_load(window):
+    """
+    Storing a variable and then loading it again becomes duplicating the value and storing it.
+    """
+    if len(window) < 2 or _load_for_store(window[0]) != window[1]:
+        return None
+    return [instructions.dup(), window[0]], 2
+
+
+def _nop(window):
+    """
+    Nops are removed.
+    """
+    if window[0] != instructions.nop():
+        return None
+    return [], 1
+
+
+RULES = [_increment, _store_then_load, _nop]
+
+# The most instructions matched by any rule.
+WINDOW_SIZE = 4
+
+
+def optimise(code):
+    """
+    Rewrites code with shorter equivalent instruction sequences.
+    :param code: a list of instructions and Goto and Label placeholders, which is left unchanged
+    :return: the optimised list
+    """
+    result = []
+    i = 0
+    while i < len(code):
+        instruction = code[i]
+
+        if not _is_instruction(instruction):
+            result.append(instruction)
+            i += 1
+            continue
+
+        window = []
+        for following in code[i:i + WINDOW_SIZE]:
+            if not _is_instruction(following):
+                break
+            window.append(following)
+
+        for rule in RULES:
+            replacement = rule(window)
+            if replacement is not None:
+                replacement_instructions, matched = replacement
+                result.extend(replacement_instructions)
+                i += matched
+                break
+        else:
+            result.append(instruction)
+            i += 1
+
+    return result
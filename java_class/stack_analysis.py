@@ -0,0 +1,310 @@
+from java_class import constant_pool_entry
+
+
+class StackAnalysisError(Exception):
+    pass
+
+
+# Instructions with a fixed length and stack effect, as {opcode: (mnemonic, length, slots popped, slots pushed)}.
+# Longs and doubles take up two stack slots.
+FIXED_INSTRUCTIONS = {
+    0x00: ("nop", 1, 0, 0),
+    0x02: ("iconst_m1", 1, 0, 1),
+    0x03: ("iconst_0", 1, 0, 1),
+    0x04: ("iconst_1", 1, 0, 1),
+    0x05: ("iconst_2", 1, 0, 1),
+    0x06: ("iconst_3", 1, 0, 1),
+    0x07: ("iconst_4", 1, 0, 1),
+    0x08: ("iconst_5", 1, 0, 1),
+    0x10: ("bipush", 2, 0, 1),
+    0x11: ("sipush", 3, 0, 1),
+    0x12: ("ldc", 2, 0, 1),
+    0x13: ("ldc_w", 3, 0, 1),
+    0x15: ("iload", 2, 0, 1),
+    0x19: ("aload", 2, 0, 1),
+    0x1A: ("iload_0", 1, 0, 1),
+    0x1B: ("iload_1", 1, 0, 1),
+    0x1C: ("iload_2", 1, 0, 1),
+    0x1D: ("iload_3", 1, 0, 1),
+    0x2A: ("aload_0", 1, 0, 1),
+    0x2B: ("aload_1", 1, 0, 1),
+    0x2C: ("aload_2", 1, 0, 1),
+    0x2D: ("aload_3", 1, 0, 1),
+    0x32: ("aaload", 1, 2, 1),
+    0x36: ("istore", 2, 1, 0),
+    0x3A: ("astore", 2, 1, 0),
+    0x3B: ("istore_0", 1, 1, 0),
+    0x3C: ("istore_1", 1, 1, 0),
+    0x3D: ("istore_2", 1, 1, 0),
+    0x3E: ("istore_3", 1, 1, 0),
+    0x4B: ("astore_0", 1, 1, 0),
+    0x4C: ("astore_1", 1, 1, 0),
+    0x4D: ("astore_2", 1, 1, 0),
+    0x4E: ("astore_3", 1, 1, 0),
+    0x57: ("pop", 1, 1, 0),
+    0x59: ("dup", 1, 1, 2),
+    0x5F: ("swap", 1, 2, 2),
+    0x60: ("iadd", 1, 2, 1),
+    0x64: ("isub", 1, 2, 1),
+    0x68: ("imul", 1, 2, 1),
+    0x78: ("ishl", 1, 2, 1),
+    0x84: ("iinc", 3, 0, 0),
+    0x85: ("i2l", 1, 1, 2),
+    0x92: ("i2c", 1, 1, 1),
+    0x94: ("lcmp", 1, 4, 1),
+    0x99: ("ifeq", 3, 1, 0),
+    0x9A: ("ifne", 3, 1, 0),
+    0x9B: ("iflt", 3, 1, 0),
+    0x9C: ("ifge", 3, 1, 0),
+    0x9D: ("ifgt", 3, 1, 0),
+    0x9E: ("ifle", 3, 1, 0),
+    0x9F: ("if_icmpeq", 3, 2, 0),
+    0xA0: ("if_icmpne", 3, 2, 0),
+    0xA1: ("if_icmplt", 3, 2, 0),
+    0xA2: ("if_icmpge", 3, 2, 0),
+    0xA3: ("if_icmpgt", 3, 2, 0),
+    0xA4: ("if_icmple", 3, 2, 0),
+    0xA7: ("goto", 3, 0, 0),
+    0xB1: ("return", 1, 0, 0),
+    0xBB: ("new", 3, 0, 1),
+    0xC8: ("goto_w", 5, 0, 0),
+}
+
+# Instructions which read or write a local variable, as {opcode: (index of the local variable, or None if the index
+# follows the opcode, number of local variable slots used)}.
+LOCAL_VARIABLE_INSTRUCTIONS = {
+    0x15: (None, 1), 0x19: (None, 1), 0x36: (None, 1), 0x3A: (None, 1), 0x84: (None, 1),
+    0x1A: (0, 1), 0x1B: (1, 1), 0x1C: (2, 1), 0x1D: (3, 1),
+    0x2A: (0, 1), 0x2B: (1, 1), 0x2C: (2, 1), 0x2D: (3, 1),
+    0x3B: (0, 1), 0x3C: (1, 1), 0x3D: (2, 1), 0x3E: (3, 1),
+    0x4B: (0, 1), 0x4C: (1, 1), 0x4D: (2, 1), 0x4E: (3, 1),
+}
+
+# Branch instructions with a 2 byte offset, and those with a 4 byte offset.
+SHORT_BRANCHES = set(range(0x99, 0xA8))
+WIDE_BRANCHES = {0xC8}
+
+# Instructions after which execution never continues with the next instruction.
+UNCONDITIONAL_TRANSFERS = {0xA7, 0xB1, 0xC8}
+
+GETSTATIC, PUTSTATIC, GETFIELD, PUTFIELD = 0xB2, 0xB3, 0xB4, 0xB5
+INVOKEVIRTUAL, INVOKESPECIAL, INVOKESTATIC = 0xB6, 0xB7, 0xB8
+WIDE = 0xC4
+
+
+def _u2(code, offset):
+    return (code[offset] << 8) | code[offset + 1]
+
+
+def _s2(code, offset):
+    value = _u2(code, offset)
+    return value - 0x10000 if value & 0x8000 else value
+
+
+def _s4(code, offset):
+    value = (_u2(code, offset) << 16) | _u2(code, offset + 2)
+    return value - 0x100000000 if value & 0x80000000 else value
+
+
+def type_size(descriptor):
+    """
+    The number of stack or local variable slots taken up by a value with the given field descriptor.
+    """
+    return 2 if descriptor in ("J", "D") else 0 if descriptor == "V" else 1
+
+
+def parse_method_descriptor(descriptor):
+    """
+    Splits a method descriptor into its argument and return field descriptors.
+    :return: a tuple (list of argument descriptors, return descriptor)
+    """
+    if not descriptor.startswith("("):
+        raise ValueError("Not a method descriptor: '{}'".format(descriptor))
+
+    arguments = []
+    i = 1
+    while descriptor[i] != ")":
+        start = i
+        while descriptor[i] == "[":
+            i += 1
+        if descriptor[i] == "L":
+            i = descriptor.index(";", i)
+        i += 1
+        arguments.append(descriptor[start:i])
+
+    return arguments, descriptor[i + 1:]
+
+
+def arguments_size(descriptor, static):
+    """
+    The number of local variable slots taken up by the arguments of a method (including 'this' if it isn't static).
+
+    Unparseable descriptors are treated as taking no arguments.
+    """
+    try:
+        arguments, _ = parse_method_descriptor(descriptor)
+    except (ValueError, IndexError):
+        arguments = []
+    return sum(type_size(argument) for argument in arguments) + (0 if static else 1)
+
+
+def member_descriptor(pool, index):
+    """
+    The descriptor of the field or method referenced by the field ref or method ref at index in the pool.
+    """
+    ref = pool[index]
+    if ref[0] not in (constant_pool_entry.id_Fieldref, constant_pool_entry.id_Methodref):
+        raise StackAnalysisError("Constant pool entry {} is not a field or method ref.".format(index))
+    name_and_type = pool[_u2(ref, 3)]
+    utf8 = pool[_u2(name_and_type, 3)]
+    return bytes(utf8[3:]).decode("utf-8")
+
+
+class _Instruction(object):
+    """
+    A decoded instruction.
+    """
+    def __init__(self, offset, length, pops, pushes, targets, falls_through, local_variable_slots):
+        self.offset = offset
+        self.length = length
+        self.pops = pops
+        self.pushes = pushes
+        self.targets = targets
+        self.falls_through = falls_through
+        self.local_variable_slots = local_variable_slots
+
+
+def _decode(code, offset, pool):
+    """
+    Decodes the instruction at offset in code.
+    """
+    opcode = code[offset]
+
+    if opcode == WIDE:
+        opcode = code[offset + 1]
+        if opcode not in (0x15, 0x19, 0x36, 0x3A, 0x84):
+            raise StackAnalysisError("Unsupported wide instruction 0x{:02X} at offset {}.".format(opcode, offset))
+        _, length, pops, pushes = FIXED_INSTRUCTIONS[opcode]
+        return _Instruction(offset, 6 if opcode == 0x84 else 4, pops, pushes, [], True, _u2(code, offset + 2) + 1)
+
+    if opcode in FIXED_INSTRUCTIONS:
+        _, length, pops, pushes = FIXED_INSTRUCTIONS[opcode]
+    elif opcode in (GETSTATIC, PUTSTATIC, GETFIELD, PUTFIELD):
+        size = type_size(member_descriptor(pool, _u2(code, offset + 1)))
+        length = 3
+        pops = {GETSTATIC: 0, PUTSTATIC: size, GETFIELD: 1, PUTFIELD: size + 1}[opcode]
+        pushes = {GETSTATIC: size, PUTSTATIC: 0, GETFIELD: size, PUTFIELD: 0}[opcode]
+    elif opcode in (INVOKEVIRTUAL, INVOKESPECIAL, INVOKESTATIC):
+        arguments, return_type = parse_method_descriptor(member_descriptor(pool, _u2(code, offset + 1)))
+        length = 3
+        pops = sum(type_size(argument) for argument in arguments) + (0 if opcode == INVOKESTATIC else 1)
+        pushes = type_size(return_type)
+    else:
+        raise StackAnalysisError("Unsupported instruction 0x{:02X} at offset {}.".format(opcode, offset))
+
+    targets = []
+    if opcode in SHORT_BRANCHES:
+        targets.append(offset + _s2(code, offset + 1))
+    elif opcode in WIDE_BRANCHES:
+        targets.append(offset + _s4(code, offset + 1))
+
+    local_variable_slots = 0
+    if opcode in LOCAL_VARIABLE_INSTRUCTIONS:
+        index, slots = LOCAL_VARIABLE_INSTRUCTIONS[opcode]
+        if index is None:
+            index = code[offset + 1]
+        local_variable_slots = index + slots
+
+    return _Instruction(offset, length, pops, pushes, targets, opcode not in UNCONDITIONAL_TRANSFERS,
+                        local_variable_slots)
+
+
+def decode(code, pool):
+    """
+    Decodes bytecode into a list of instructions.
+    """
+    result = []
+    offset = 0
+    while offset < len(code):
+        instruction = _decode(code, offset, pool)
+        result.append(instruction)
+        offset += instruction.length
+    if offset != len(code):
+        raise StackAnalysisError("The last instruction is truncated.")
+    return result
+
+
+def frame_offsets(code, pool):
+    """
+    The offsets in code which need a stack map frame: every branch target, and every instruction which can't be
+    reached by falling through from the instruction before it.
+    """
+    decoded = decode(bytes(code), pool)
+
+    offsets = set()
+    for instruction in decoded:
+        offsets.update(instruction.targets)
+        end = instruction.offset + instruction.length
+        if not instruction.falls_through and end < len(code):
+            offsets.add(end)
+
+    return sorted(offsets)
+
+
+def analyse(code, pool, descriptor, static):
+    """
+    Works out the maximum stack depth and number of local variables needed to run a method.
+
+    The stack depth is tracked through every path through the code. Code which can't be reached from the start of the
+    method (e.g. after an unconditional goto) is analysed as if it was entered with an empty stack.
+
+    :param code: the method's bytecode
+    :param pool: the constant pool of the class that the method belongs to
+    :param descriptor: the method's descriptor
+    :param static: whether the method is static
+    :return: a tuple (max stack, max locals)
+    :raises: StackAnalysisError if the stack underflows, has different depths along two paths which join, or if
+        execution can run off the end of the code.
+    """
+    decoded = decode(bytes(code), pool)
+    by_offset = dict((instruction.offset, instruction) for instruction in decoded)
+
+    depths = {}
+    max_stack = 0
+
+    for start in decoded:
+        if start.offset in depths:
+            continue
+
+        pending = [(start.offset, 0)]
+        while pending:
+            offset, depth = pending.pop()
+
+            if offset in depths:
+                if depths[offset] != depth:
+                    raise StackAnalysisError("Inconsistent stack depth at offset {} ({} and {})."
+                                             .format(offset, depths[offset], depth))
+                continue
+
+            instruction = by_offset.get(offset)
+            if instruction is None:
+                raise StackAnalysisError("Jump to offset {}, which is not the start of an instruction.".format(offset))
+            depths[offset] = depth
+
+            if depth < instruction.pops:
+                raise StackAnalysisError("Stack underflow at offset {}.".format(offset))
+            depth += instruction.pushes - instruction.pops
+            max_stack = max(max_stack, depth, depths[offset])
+
+            successors = list(instruction.targets)
+            if instruction.falls_through:
+                successors.append(offset + instruction.length)
+            for successor in successors:
+                if successor == len(code):
+                    raise StackAnalysisError("Execution can fall off the end of the code at offset {}.".format(offset))
+                pending.append((successor, depth))
+
+    max_locals = max([arguments_size(descriptor, static)] +
+                     [instruction.local_variable_slots for instruction in decoded])
+
+    return max_stack, max_locals
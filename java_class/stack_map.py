@@ -0,0 +1,114 @@
+from java_class.byte_utils import u1, u2
+
+"""
+Verification type tags and frame types of the StackMapTable attribute, see
+https://docs.oracle.com/javase/specs/jvms/se8/html/jvms-4.html#jvms-4.7.4
+"""
+ITEM_Top = 0
+ITEM_Integer = 1
+ITEM_Float = 2
+ITEM_Double = 3
+ITEM_Long = 4
+ITEM_Null = 5
+ITEM_UninitializedThis = 6
+ITEM_Object = 7
+
+SAME_FRAME_MAX = 63
+SAME_LOCALS_1_STACK_ITEM = 64
+SAME_LOCALS_1_STACK_ITEM_EXTENDED = 247
+CHOP_FRAME = 251  # Minus the number of locals chopped.
+SAME_FRAME_EXTENDED = 251
+APPEND_FRAME = 251  # Plus the number of locals appended.
+FULL_FRAME = 255
+
+# Most locals that can be chopped or appended by a single frame.
+MAX_CHOP_OR_APPEND = 3
+
+
+class StackMapFrame(object):
+    """
+    The types of the local variables and stack at an offset in a method's code.
+
+    Types are given as field descriptors, e.g. "I" or "[Ljava/lang/String;". A long or double takes up a single entry
+    in these lists even though it takes up two local variables or stack slots.
+    """
+    def __init__(self, offset, local_types, stack_types):
+        self.offset = offset
+        self.locals = list(local_types)
+        self.stack = list(stack_types)
+
+
+def verification_type(pool, descriptor):
+    """
+    Encodes a field descriptor as a verification_type_info structure.
+    """
+    simple_types = {
+        "I": ITEM_Integer, "Z": ITEM_Integer, "B": ITEM_Integer, "C": ITEM_Integer, "S": ITEM_Integer,
+        "F": ITEM_Float,
+        "J": ITEM_Long,
+        "D": ITEM_Double,
+    }
+    if descriptor in simple_types:
+        return u1(simple_types[descriptor])
+
+    if descriptor.startswith("L") and descriptor.endswith(";"):
+        class_name = descriptor[1:-1]
+    elif descriptor.startswith("["):
+        class_name = descriptor  # Array classes are named by their descriptor.
+    else:
+        raise ValueError("Invalid field descriptor '{}'".format(descriptor))
+
+    return u1(ITEM_Object) + u2(pool.add_class(class_name))
+
+
+def _verification_types(pool, descriptors):
+    return b"".join(verification_type(pool, descriptor) for descriptor in descriptors)
+
+
+def encode_frame(pool, frame, previous_locals, offset_delta):
+    """
+    Encodes a frame as a stack_map_frame structure, using the most compact form possible given the locals of the
+    previous frame.
+    """
+    locals, stack = frame.locals, frame.stack
+
+    if locals == previous_locals and len(stack) == 0:
+        if offset_delta <= SAME_FRAME_MAX:
+            return u1(offset_delta)
+        return u1(SAME_FRAME_EXTENDED) + u2(offset_delta)
+
+    if locals == previous_locals and len(stack) == 1:
+        if offset_delta <= SAME_FRAME_MAX:
+            return u1(SAME_LOCALS_1_STACK_ITEM + offset_delta) + verification_type(pool, stack[0])
+        return u1(SAME_LOCALS_1_STACK_ITEM_EXTENDED) + u2(offset_delta) + verification_type(pool, stack[0])
+
+    if len(stack) == 0:
+        difference = len(locals) - len(previous_locals)
+        if 0 < difference <= MAX_CHOP_OR_APPEND and locals[:len(previous_locals)] == previous_locals:
+            return u1(APPEND_FRAME + difference) + u2(offset_delta) \
+                   + _verification_types(pool, locals[len(previous_locals):])
+        if 0 < -difference <= MAX_CHOP_OR_APPEND and previous_locals[:len(locals)] == locals:
+            return u1(CHOP_FRAME + difference) + u2(offset_delta)
+
+    return u1(FULL_FRAME) + u2(offset_delta) \
+        + u2(len(locals)) + _verification_types(pool, locals) \
+        + u2(len(stack)) + _verification_types(pool, stack)
+
+
+def encode_stack_map_table(pool, initial_locals, frames):
+    """
+    Encodes the body of a StackMapTable attribute (everything after attribute_length).
+    :param pool: the constant pool, which class references are added to
+    :param initial_locals: the types of the local variables on entry to the method (i.e. its arguments)
+    :param frames: the frames, which must be at distinct offsets
+    """
+    result = [u2(len(frames))]
+
+    previous_locals = list(initial_locals)
+    previous_offset = -1
+    for frame in sorted(frames, key=lambda f: f.offset):
+        result.append(encode_frame(pool, frame, previous_locals, frame.offset - previous_offset - 1))
+        previous_locals = frame.locals
+        previous_offset = frame.offset
+
+    return b"".join(result)
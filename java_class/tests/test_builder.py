@@ -0,0 +1,298 @@
+import unittest
+
+from intermediate import ast, operators
+from intermediate.asl import compact_flatten_ast, flatten_ast
+from intermediate.compact_asl import CompactAsl
+
+from java_class import instructions
+from java_class.builder import Builder, CompilationError, Goto, Label
+
+
+class BuilderTests(unittest.TestCase):
+
+    def test_GIVEN_a_goto_before_its_label_WHEN_computing_gotos_THEN_jump_is_forwards_to_the_label(self):
+        code = [Goto("a"), instructions.iadd(), Label("a"), instructions.voidreturn()]
+
+        computed = Builder._compute_gotos(code)
+
+        self.assertEqual(computed, [instructions.goto(4), instructions.iadd(), instructions.nop(),
+                                    instructions.voidreturn()])
+
+    def test_GIVEN_a_conditional_goto_after_its_label_WHEN_computing_gotos_THEN_jump_is_backwards_to_the_label(self):
+        code = [instructions.iadd(), Label("a"), instructions.iadd(), Goto("a", conditional=True)]
+
+        computed = Builder._compute_gotos(code)
+
+        self.assertEqual(computed, [instructions.iadd(), instructions.nop(), instructions.iadd(),
+                                    instructions.ifeq(-2)])
+
+    def test_GIVEN_thousands_of_labels_and_gotos_WHEN_computing_gotos_THEN_every_jump_lands_on_its_label(self):
+        count = 5000
+        code = []
+        for i in range(count):
+            code.extend([Label(str(i)), instructions.iadd(), Goto(str((i * 7) % count))])
+
+        computed = Builder._compute_gotos(code)
+
+        label_length = len(instructions.nop())
+        block_length = label_length + len(instructions.iadd()) + len(instructions.goto(0))
+        for i in range(count):
+            goto_offset = i * block_length + label_length + len(instructions.iadd())
+            target_offset = ((i * 7) % count) * block_length
+            self.assertEqual(computed[3 * i + 2], instructions.goto(target_offset - goto_offset))
+
+    def test_GIVEN_a_goto_too_far_from_its_label_for_a_short_jump_WHEN_computing_gotos_THEN_goto_w_is_used(self):
+        padding = [instructions.iadd()] * 40000
+        code = [Goto("a")] + padding + [Label("a")]
+
+        computed = Builder._compute_gotos(code)
+
+        self.assertEqual(computed[0], instructions.goto_w(len(instructions.goto_w(0)) + len(padding)))
+        self.assertEqual(len(computed), len(code))
+
+    def test_GIVEN_a_conditional_goto_too_far_from_its_label_WHEN_computing_gotos_THEN_ifne_skips_a_goto_w(self):
+        padding = [instructions.iadd()] * 40000
+        code = [Label("a")] + padding + [Goto("a", conditional=True), instructions.voidreturn()]
+
+        computed = Builder._compute_gotos(code)
+
+        goto_w_offset = len(instructions.nop()) + len(padding) + len(instructions.ifne(0))
+        self.assertEqual(computed[-3:], [instructions.ifne(len(instructions.ifne(0)) + len(instructions.goto_w(0))),
+                                         instructions.goto_w(-goto_w_offset),
+                                         instructions.voidreturn()])
+
+    def test_GIVEN_widening_a_goto_pushes_another_out_of_range_WHEN_computing_gotos_THEN_both_are_widened(self):
+        # The forward goto only just fits while both gotos are short, but the backward goto is out of range, and
+        # widening it pushes the forward goto out of range too.
+        code = [Label("back")] + [instructions.iadd()] * 10 + [Goto("forward")] + [instructions.iadd()] * (2**15 - 7) \
+            + [Goto("back"), Label("forward"), instructions.voidreturn()]
+
+        computed = Builder._compute_gotos(code)
+
+        self.assertEqual(computed[11], instructions.goto_w(len(instructions.goto_w(0)) * 2 + 2**15 - 7))
+        self.assertEqual(computed[-3], instructions.goto_w(-(len(instructions.nop()) + 10 +
+                                                             len(instructions.goto_w(0)) + 2**15 - 7)))
+
+    def test_GIVEN_a_goto_to_a_label_which_does_not_exist_WHEN_building_THEN_compilation_error(self):
+        builder = Builder("Test")
+        builder.code.append(Goto("nowhere"))
+
+        with self.assertRaises(CompilationError):
+            builder.build()
+
+    def test_GIVEN_default_builder_WHEN_assigning_a_character_THEN_it_is_stored_in_a_local_variable(self):
+        builder = Builder("Test").asl_dump([ast.Value(1), ast.Assign("romeo", None)])
+
+        index = builder.local_variables["romeo"]
+        self.assertEqual(builder.code[-1], instructions.istore(index))
+        self.assertEqual(len(builder.output_class.fields), 0)
+
+    def test_GIVEN_default_builder_WHEN_building_THEN_every_int_local_variable_is_initialised_to_zero_first(self):
+        builder = Builder("Test").asl_dump([ast.DynamicValue("romeo"), ast.Assign("juliet", None)])
+
+        code = builder.build().methods[0][3][0]["instructions"]
+
+        for index in range(1, len(builder.local_variable_types)):
+            self.assertEqual(code[2 * index - 2: 2 * index], [instructions.bipush(0), instructions.istore(index)])
+
+    def test_GIVEN_static_fields_builder_WHEN_assigning_a_character_THEN_it_is_stored_in_a_static_field(self):
+        builder = Builder("Test", use_static_fields=True).asl_dump([ast.Value(1), ast.Assign("romeo", None)])
+
+        field_ref = builder.output_class.pool.add_field_ref("Test", "romeo", "I")
+        self.assertEqual(builder.code[-1], instructions.putstatic(field_ref))
+        self.assertEqual(builder.local_variables, {})
+
+    def test_GIVEN_shift_left_operator_WHEN_dumping_asl_THEN_ishl_is_used(self):
+        builder = Builder("Test").asl_dump([ast.BinaryOperator(None, operators.Operators.SHIFT_LEFT, None)])
+
+        self.assertEqual(builder.code, [instructions.ishl()])
+
+    def test_GIVEN_constants_WHEN_dumping_asl_THEN_the_shortest_instruction_to_push_each_is_used(self):
+        values = [5, -128, 128, -32768, 32768, -2 ** 31]
+        builder = Builder("Test").asl_dump([ast.Value(value) for value in values])
+
+        pool = builder.output_class.pool
+        self.assertEqual(builder.code, [
+            instructions.bipush(5),
+            instructions.bipush(-128),
+            instructions.sipush(128),
+            instructions.sipush(-32768),
+            instructions.ldc(pool.add_integer(32768)),
+            instructions.ldc(pool.add_integer(-2 ** 31)),
+        ])
+
+    def test_GIVEN_integer_constant_beyond_first_256_pool_entries_WHEN_pushed_THEN_ldc_w_is_used(self):
+        builder = Builder("Test")
+        for i in range(300):
+            builder.output_class.pool.add_integer(100000 + i)
+
+        builder.asl_dump([ast.Value(100299)])
+
+        self.assertEqual(builder.code, [instructions.ldc_w(builder.output_class.pool.add_integer(100299))])
+
+    def test_GIVEN_optimising_builder_WHEN_building_THEN_labels_take_up_no_space(self):
+        builder = Builder("Test").asl_dump([ast.Label("a", []), ast.Goto("a")])
+
+        code = builder.build().methods[0][3][0]["instructions"]
+
+        self.assertIn(instructions.goto(0), code)
+        self.assertNotIn(instructions.nop(), code)
+
+    def test_GIVEN_non_optimising_builder_WHEN_building_THEN_labels_are_nops(self):
+        builder = Builder("Test", optimise=False).asl_dump([ast.Label("a", []), ast.Goto("a")])
+
+        code = builder.build().methods[0][3][0]["instructions"]
+
+        self.assertIn(instructions.nop(), code)
+        self.assertIn(instructions.goto(-1), code)
+
+    def test_GIVEN_optimising_builder_WHEN_comparing_THEN_ints_are_subtracted_rather_than_compared_as_longs(self):
+        builder = Builder("Test").asl_dump([ast.Compare("romeo", "juliet")])
+
+        self.assertIn(instructions.isub(), builder.code)
+        self.assertNotIn(instructions.lcmp(), builder.code)
+
+    def test_GIVEN_buffered_output_WHEN_printing_a_character_THEN_it_is_printed_to_the_buffered_stream(self):
+        builder = Builder("Test", buffered_output=True).asl_dump([ast.PrintVariable("romeo", as_char=True)])
+
+        pool = builder.output_class.pool
+        stream_index = builder.local_variables[Builder.OUTPUT_STREAM]
+        self.assertEqual(builder.local_variable_types[stream_index], "Ljava/io/PrintStream;")
+        self.assertEqual(builder.code[-4:], [
+            instructions.aload(stream_index),
+            instructions.swap(),
+            instructions.i2c(),
+            instructions.invokevirtual(pool.add_method_ref("java/io/PrintStream", "print", "(C)V")),
+        ])
+
+    def test_GIVEN_buffered_output_WHEN_building_THEN_stream_is_created_first_and_flushed_before_returning(self):
+        builder = Builder("Test", buffered_output=True)
+
+        code = builder.build().methods[0][3][0]["instructions"]
+
+        pool = builder.output_class.pool
+        stream_index = builder.local_variables[Builder.OUTPUT_STREAM]
+        self.assertIn(instructions.new(pool.add_class("java/io/PrintStream")), code)
+        self.assertLess(code.index(instructions.astore(stream_index)), code.index(instructions.aload(stream_index)))
+        self.assertEqual(code[-3:], [
+            instructions.aload(stream_index),
+            instructions.invokevirtual(pool.add_method_ref("java/io/PrintStream", "flush", "()V")),
+            instructions.voidreturn(),
+        ])
+
+    def test_GIVEN_stdin_input_WHEN_inputting_a_number_THEN_a_line_is_read_from_the_input_reader(self):
+        builder = Builder("Test", stdin_input=True).asl_dump([ast.InputVariable("romeo", as_char=False)])
+
+        pool = builder.output_class.pool
+        reader_index = builder.local_variables[Builder.INPUT_READER]
+        self.assertEqual(builder.local_variable_types[reader_index], "Ljava/io/BufferedReader;")
+        self.assertNotIn(Builder.INPUT_INDEX, builder.local_variables)
+        self.assertEqual(builder.code[:2], [
+            instructions.aload(reader_index),
+            instructions.invokevirtual(
+                pool.add_method_ref("java/io/BufferedReader", "readLine", "()Ljava/lang/String;")),
+        ])
+
+    def test_GIVEN_stdin_input_WHEN_inputting_a_character_THEN_one_character_is_read_from_the_input_reader(self):
+        builder = Builder("Test", stdin_input=True).asl_dump([ast.InputVariable("romeo", as_char=True)])
+
+        pool = builder.output_class.pool
+        self.assertEqual(builder.code, [
+            instructions.aload(builder.local_variables[Builder.INPUT_READER]),
+            instructions.invokevirtual(pool.add_method_ref("java/io/BufferedReader", "read", "()I")),
+            instructions.istore(builder.local_variables["romeo"]),
+        ])
+
+    def test_GIVEN_compact_asl_WHEN_building_THEN_code_is_the_same_as_for_a_list_of_nodes(self):
+        add = ast.BinaryOperator(ast.Value(300), operators.Operators.ADD, ast.DynamicValue("romeo"))
+        play = ast.Label("play", [ast.Assign("romeo", ast.Value(0), dynamic=False), ast.Label("scene", [
+            ast.Assign("juliet", add), ast.PrintVariable("juliet"), ast.Compare("romeo", "juliet"),
+            ast.ConditionalGoto("scene")])])
+
+        expected = Builder("Test").asl_dump(flatten_ast(play)).build()
+        actual = Builder("Test").asl_dump(compact_flatten_ast(play)).build()
+
+        self.assertEqual(actual.methods[0][3][0]["instructions"], expected.methods[0][3][0]["instructions"])
+
+    def test_GIVEN_each_node_type_WHEN_dumping_it_as_a_node_or_compactly_THEN_the_code_is_the_same(self):
+        nodes = [
+            ast.Goto("scene"),
+            ast.ConditionalGoto("scene"),
+            ast.Label("scene", []),
+            ast.BinaryOperator(None, operators.Operators.SHIFT_LEFT, None),
+            ast.Value(300),
+            ast.DynamicValue("romeo"),
+            ast.Assign("romeo", None),
+            ast.PrintVariable("romeo", as_char=True),
+            ast.InputVariable("romeo", as_char=False),
+            ast.NoOp(),
+            ast.Compare("romeo", "juliet"),
+        ]
+        self.assertEqual(set(Builder._operand_emitters), set(Builder._emitters))
+        self.assertEqual(set(type(node) for node in nodes), set(Builder._emitters))
+
+        def comparable(code):
+            return [(item.name, item.conditional) if isinstance(item, Goto) else item for item in code]
+
+        for node in nodes:
+            for options in [{}, {"optimise": False}, {"use_static_fields": True}]:
+                expected = Builder("Test", **options).asl_dump([node])
+                actual = Builder("Test", **options).asl_dump(CompactAsl([node]))
+
+                self.assertEqual(comparable(actual.code), comparable(expected.code), node)
+                self.assertEqual(actual.local_variables, expected.local_variables, node)
+
+    def test_GIVEN_an_unknown_node_type_WHEN_dumping_asl_THEN_compilation_error(self):
+        with self.assertRaises(CompilationError):
+            Builder("Test").asl_dump([object()])
+
+    def test_GIVEN_a_subclass_of_a_node_type_WHEN_dumping_asl_THEN_the_emitter_for_the_node_type_is_used(self):
+        class SpecialValue(ast.Value):
+            pass
+
+        builder = Builder("Test").asl_dump([SpecialValue(3)])
+
+        self.assertEqual(builder.code, [instructions.bipush(3)])
+
+    def test_GIVEN_emitters_registered_on_a_builder_subclass_WHEN_dumping_asl_THEN_only_the_subclass_uses_them(self):
+        class Swap(ast.AstNode):
+            def __str__(self):
+                return "Swap"
+
+        class SwappingBuilder(Builder):
+            pass
+
+        @SwappingBuilder.register_emitter(Swap)
+        def emit_swap(builder, node):
+            builder.code.append(instructions.swap())
+
+        SwappingBuilder.register_emitter(ast.NoOp, lambda builder, node: builder.code.append(instructions.nop()))
+
+        self.assertEqual(SwappingBuilder("Test").asl_dump([Swap(), ast.NoOp()]).code,
+                         [instructions.swap(), instructions.nop()])
+        self.assertEqual(Builder("Test").asl_dump([ast.NoOp()]).code, [])
+        with self.assertRaises(CompilationError):
+            Builder("Test").asl_dump([Swap()])
+
+    def test_GIVEN_emitters_registered_on_a_builder_subclass_WHEN_dumping_compact_asl_THEN_they_are_used(self):
+        class Swap(ast.AstNode):
+            def __str__(self):
+                return "Swap"
+
+        class SwappingBuilder(Builder):
+            pass
+
+        SwappingBuilder.register_emitter(Swap, lambda builder, node: builder.code.append(instructions.swap()))
+        SwappingBuilder.register_emitter(ast.NoOp, lambda builder, node: builder.code.append(instructions.nop()))
+        asl = CompactAsl([Swap(), ast.NoOp(), ast.Value(1)])
+
+        self.assertEqual(SwappingBuilder("Test").asl_dump(asl).code,
+                         [instructions.swap(), instructions.nop(), instructions.bipush(1)])
+        self.assertEqual(Builder("Test").asl_dump(CompactAsl([ast.NoOp()])).code, [])
+
+    def test_GIVEN_code_leaving_values_on_the_stack_at_a_label_WHEN_building_THEN_compilation_error(self):
+        builder = Builder("Test")
+        builder.code.extend([Label("a"), instructions.bipush(1), Goto("a")])
+
+        with self.assertRaises(CompilationError):
+            builder.build()
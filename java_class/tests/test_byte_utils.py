@@ -0,0 +1,48 @@
+import unittest
+
+from java_class import byte_utils
+
+
+class ByteUtilsTests(unittest.TestCase):
+
+    def test_GIVEN_ints_in_range_THEN_they_are_encoded_big_endian(self):
+        self.assertEqual(byte_utils.u1(0xAB), b"\xAB")
+        self.assertEqual(byte_utils.u2(0xABCD), b"\xAB\xCD")
+        self.assertEqual(byte_utils.u4(0xCAFEBABE), b"\xCA\xFE\xBA\xBE")
+        self.assertEqual(byte_utils.s1(-1), b"\xFF")
+        self.assertEqual(byte_utils.s2(-2), b"\xFF\xFE")
+        self.assertEqual(byte_utils.s4(-2 ** 31), b"\x80\x00\x00\x00")
+
+    def test_GIVEN_ints_at_the_limits_of_each_encoding_THEN_they_are_encoded(self):
+        for encoder, length, low, high in [(byte_utils.u1, 1, 0, 2 ** 8 - 1), (byte_utils.u2, 2, 0, 2 ** 16 - 1),
+                                           (byte_utils.u4, 4, 0, 2 ** 32 - 1), (byte_utils.s1, 1, -2 ** 7, 2 ** 7 - 1),
+                                           (byte_utils.s2, 2, -2 ** 15, 2 ** 15 - 1),
+                                           (byte_utils.s4, 4, -2 ** 31, 2 ** 31 - 1)]:
+            self.assertEqual(len(encoder(low)), length)
+            self.assertEqual(len(encoder(high)), length)
+
+    def test_GIVEN_ints_out_of_range_THEN_value_error_is_raised(self):
+        for encoder, value in [(byte_utils.u1, 256), (byte_utils.u1, -1), (byte_utils.u2, 2 ** 16),
+                               (byte_utils.u4, -1), (byte_utils.s1, 128), (byte_utils.s2, -2 ** 15 - 1),
+                               (byte_utils.s4, 2 ** 31)]:
+            with self.assertRaises(ValueError):
+                encoder(value)
+
+    def test_GIVEN_ascii_string_THEN_modified_utf8_is_one_byte_per_character(self):
+        self.assertEqual(byte_utils.modified_utf8("Romeo"), b"Romeo")
+
+    def test_GIVEN_null_character_THEN_modified_utf8_encodes_it_as_two_bytes(self):
+        self.assertEqual(byte_utils.modified_utf8("a\x00b"), b"a\xC0\x80b")
+
+    def test_GIVEN_non_ascii_characters_THEN_modified_utf8_encodes_them_as_utf8(self):
+        self.assertEqual(byte_utils.modified_utf8("Rom\xe9o \u00f0\u4e2d"), "Rom\xe9o \u00f0\u4e2d".encode("utf-8"))
+
+    def test_GIVEN_supplementary_character_THEN_modified_utf8_encodes_its_surrogate_pair(self):
+        self.assertEqual(byte_utils.modified_utf8("\U0001F600"), b"\xED\xA0\xBD\xED\xB8\x80")
+
+    def test_GIVEN_surrogate_pair_as_on_narrow_python_builds_THEN_modified_utf8_encodes_each_surrogate(self):
+        self.assertEqual(byte_utils.modified_utf8("a\ud83d\ude00"), b"a\xED\xA0\xBD\xED\xB8\x80")
+
+    def test_GIVEN_characters_either_side_of_the_surrogates_THEN_modified_utf8_encodes_them_as_utf8(self):
+        text = "\ud7ff\ue000\uffff"
+        self.assertEqual(byte_utils.modified_utf8(text), text.encode("utf-8"))
@@ -43,3 +43,44 @@ class ConstantPoolTests(unittest.TestCase):
 
         self.assertEqual(len_before, len_after)
         self.assertEqual(idx_after, idx_before)
+
+    def test_GIVEN_a_field_ref_WHEN_adding_it_twice_THEN_same_index_returned_and_length_of_pool_not_changed(self):
+        pool = ConstantPool.generate_default(self.this_class, self.super_class)
+
+        idx_before = pool.add_field_ref(self.this_class, "field", "I")
+        len_before = len(pool)
+
+        idx_after = pool.add_field_ref(self.this_class, "field", "I")
+
+        self.assertEqual(idx_after, idx_before)
+        self.assertEqual(len(pool), len_before)
+
+    def test_GIVEN_a_field_ref_WHEN_adding_method_ref_with_same_name_and_type_THEN_indices_differ(self):
+        pool = ConstantPool.generate_default(self.this_class, self.super_class)
+
+        field_idx = pool.add_field_ref(self.this_class, "member", "I")
+        method_idx = pool.add_method_ref(self.this_class, "member", "I")
+
+        self.assertNotEqual(field_idx, method_idx)
+        self.assertEqual(list(pool)[field_idx - 1][1:], list(pool)[method_idx - 1][1:])
+
+    def test_GIVEN_an_integer_WHEN_adding_it_twice_THEN_one_constant_integer_entry_is_added(self):
+        pool = ConstantPool.generate_default(self.this_class, self.super_class)
+
+        idx_before = pool.add_integer(-100000)
+        idx_after = pool.add_integer(-100000)
+
+        self.assertEqual(idx_after, idx_before)
+        self.assertEqual(pool[idx_before], b"\x03\xFF\xFE\x79\x60")
+
+    def test_GIVEN_non_ascii_text_WHEN_making_utf8_entry_THEN_length_is_the_number_of_encoded_bytes(self):
+        self.assertEqual(utf8("\xe9\U0001F600"), b"\x01\x00\x08\xC3\xA9\xED\xA0\xBD\xED\xB8\x80")
+
+    def test_GIVEN_entries_in_pool_THEN_iterating_gives_them_in_index_order(self):
+        pool = ConstantPool()
+
+        items = [utf8("A"), utf8("B"), utf8("C")]
+        indices = [pool.get_index(item) for item in items]
+
+        self.assertEqual(indices, [1, 2, 3])
+        self.assertEqual(list(pool), items)
@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from java_class import access_modifiers, instructions
+from java_class.constant_pool_entry import utf8
+from java_class.exporter import Exporter
+from java_class.java_class import JavaClass
+from java_class.stack_map import StackMapFrame
+
+
+class ExporterTests(unittest.TestCase):
+
+    def _class_with_stack_map(self, major_version):
+        klass = JavaClass("Hello")
+        code = [instructions.goto(4), instructions.nop(), instructions.voidreturn()]
+        frames = [StackMapFrame(3, ["[Ljava/lang/String;"], []), StackMapFrame(4, ["[Ljava/lang/String;"], [])]
+        klass.add_method("main", "([Ljava/lang/String;)V", access_modifiers.PUBLIC | access_modifiers.STATIC, code,
+                         frames)
+        klass.set_version(major_version)
+        return klass
+
+    def _export(self, klass):
+        return Exporter(klass).export_to_bytes()
+
+    def test_GIVEN_a_class_WHEN_exported_THEN_it_starts_with_magic_number_and_version(self):
+        klass = self._class_with_stack_map(50)
+
+        self.assertEqual(self._export(klass)[:8], b"\xCA\xFE\xBA\xBE\x00\x00\x00\x32")
+
+    def test_GIVEN_class_version_50_WHEN_exported_THEN_stack_map_table_is_written(self):
+        klass = self._class_with_stack_map(50)
+
+        stack_map_table = klass.methods[0][3][0]["stack_map_table"]
+        exported = self._export(klass)
+
+        self.assertIn(utf8("StackMapTable"), klass.pool)
+        self.assertIn(stack_map_table, exported)
+        self.assertEqual(len(exported), len(self._export(self._class_with_stack_map(49))) + 6 + len(stack_map_table))
+
+    def test_GIVEN_class_version_49_WHEN_exported_THEN_stack_map_table_is_not_written(self):
+        klass = self._class_with_stack_map(49)
+
+        self.assertNotIn(klass.methods[0][3][0]["stack_map_table"], self._export(klass))
+
+    def test_GIVEN_a_class_WHEN_exported_as_a_file_THEN_file_contains_the_exported_bytes(self):
+        klass = self._class_with_stack_map(50)
+        output_dir = tempfile.mkdtemp()
+        try:
+            Exporter(klass).export_as_file(output_dir)
+
+            with open(os.path.join(output_dir, "Hello.class"), "rb") as f:
+                self.assertEqual(f.read(), self._export(klass))
+        finally:
+            shutil.rmtree(output_dir)
@@ -0,0 +1,39 @@
+import unittest
+
+from java_class import instructions
+
+
+class InstructionsTests(unittest.TestCase):
+
+    def test_GIVEN_low_local_variable_indices_THEN_short_forms_of_load_and_store_are_used(self):
+        for idx in range(4):
+            self.assertEqual(len(instructions.iload(idx)), 1)
+            self.assertEqual(len(instructions.istore(idx)), 1)
+
+    def test_GIVEN_local_variable_index_fits_in_a_byte_THEN_load_and_store_take_a_one_byte_index(self):
+        self.assertEqual(instructions.iload(200), b"\x15\xC8")
+        self.assertEqual(instructions.istore(200), b"\x36\xC8")
+        self.assertEqual(instructions.iinc(200, -1), b"\x84\xC8\xFF")
+
+    def test_GIVEN_local_variable_index_does_not_fit_in_a_byte_THEN_wide_forms_are_used(self):
+        self.assertEqual(instructions.iload(300), b"\xC4\x15\x01\x2C")
+        self.assertEqual(instructions.istore(300), b"\xC4\x36\x01\x2C")
+        self.assertEqual(instructions.iinc(300, 1), b"\xC4\x84\x01\x2C\x00\x01")
+
+    def test_GIVEN_increment_does_not_fit_in_a_byte_THEN_wide_iinc_is_used(self):
+        self.assertEqual(instructions.iinc(1, 1000), b"\xC4\x84\x00\x01\x03\xE8")
+
+    def test_GIVEN_constants_from_minus_one_to_five_THEN_iconst_is_used(self):
+        for value in range(-1, 6):
+            self.assertEqual(instructions.bipush(value), bytes([0x3 + value]))
+
+    def test_GIVEN_other_byte_constants_THEN_bipush_takes_a_signed_byte(self):
+        self.assertEqual(instructions.bipush(6), b"\x10\x06")
+        self.assertEqual(instructions.bipush(-128), b"\x10\x80")
+
+    def test_GIVEN_short_constant_THEN_sipush_takes_a_signed_short(self):
+        self.assertEqual(instructions.sipush(-32768), b"\x11\x80\x00")
+        self.assertEqual(instructions.sipush(1000), b"\x11\x03\xE8")
+
+    def test_GIVEN_constant_pool_index_THEN_ldc_w_takes_a_two_byte_index(self):
+        self.assertEqual(instructions.ldc_w(300), b"\x13\x01\x2C")
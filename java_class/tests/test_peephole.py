@@ -0,0 +1,49 @@
+import unittest
+
+from java_class import instructions, peephole
+from java_class.builder import Goto, Label
+
+
+class PeepholeTests(unittest.TestCase):
+
+    def test_GIVEN_load_add_constant_and_store_of_the_same_local_THEN_iinc_is_used(self):
+        code = [instructions.iload(4), instructions.bipush(-3), instructions.iadd(), instructions.istore(4)]
+
+        self.assertEqual(peephole.optimise(code), [instructions.iinc(4, -3)])
+
+    def test_GIVEN_constant_added_to_a_load_THEN_iinc_is_used(self):
+        code = [instructions.sipush(1000), instructions.iload(300), instructions.iadd(), instructions.istore(300)]
+
+        self.assertEqual(peephole.optimise(code), [instructions.iinc(300, 1000)])
+
+    def test_GIVEN_sum_stored_to_a_different_local_THEN_it_is_unchanged(self):
+        code = [instructions.iload(1), instructions.bipush(1), instructions.iadd(), instructions.istore(2)]
+
+        self.assertEqual(peephole.optimise(code), code)
+
+    def test_GIVEN_store_then_load_of_a_local_THEN_value_is_duplicated_instead(self):
+        code = [instructions.istore(2), instructions.iload(2)]
+
+        self.assertEqual(peephole.optimise(code), [instructions.dup(), instructions.istore(2)])
+
+    def test_GIVEN_store_then_load_of_a_static_field_THEN_value_is_duplicated_instead(self):
+        code = [instructions.putstatic(7), instructions.getstatic(7)]
+
+        self.assertEqual(peephole.optimise(code), [instructions.dup(), instructions.putstatic(7)])
+
+    def test_GIVEN_store_then_load_of_different_variables_THEN_it_is_unchanged(self):
+        code = [instructions.istore(2), instructions.iload(3), instructions.putstatic(7), instructions.getstatic(8)]
+
+        self.assertEqual(peephole.optimise(code), code)
+
+    def test_GIVEN_nops_THEN_they_are_removed(self):
+        code = [instructions.nop(), instructions.iadd(), instructions.nop()]
+
+        self.assertEqual(peephole.optimise(code), [instructions.iadd()])
+
+    def test_GIVEN_a_label_between_a_store_and_a_load_THEN_they_are_not_fused(self):
+        label = Label("a")
+        goto = Goto("a")
+        code = [instructions.istore(2), label, instructions.iload(2), goto]
+
+        self.assertEqual(peephole.optimise(code), code)
@@ -0,0 +1,117 @@
+import unittest
+
+from java_class import instructions
+from java_class.constant_pool import ConstantPool
+from java_class.stack_analysis import StackAnalysisError, analyse, arguments_size, parse_method_descriptor
+
+
+MAIN_DESCRIPTOR = "([Ljava/lang/String;)V"
+
+
+class StackAnalysisTests(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = ConstantPool.generate_default("Test")
+
+    def _analyse(self, code, descriptor=MAIN_DESCRIPTOR, static=True):
+        return analyse(b"".join(code), self.pool, descriptor, static)
+
+    def test_GIVEN_no_code_THEN_stack_is_empty_and_locals_only_hold_arguments(self):
+        self.assertEqual(self._analyse([]), (0, 1))
+
+    def test_GIVEN_straight_line_code_THEN_max_stack_is_deepest_point(self):
+        code = [
+            instructions.bipush(1),
+            instructions.bipush(2),
+            instructions.bipush(3),
+            instructions.iadd(),
+            instructions.iadd(),
+            instructions.istore(1),
+            instructions.voidreturn(),
+        ]
+
+        self.assertEqual(self._analyse(code), (3, 2))
+
+    def test_GIVEN_longs_on_the_stack_THEN_they_take_two_slots_each(self):
+        code = [
+            instructions.bipush(1),
+            instructions.i2l(),
+            instructions.bipush(2),
+            instructions.i2l(),
+            instructions.lcmp(),
+            instructions.istore(1),
+            instructions.voidreturn(),
+        ]
+
+        self.assertEqual(self._analyse(code)[0], 4)
+
+    def test_GIVEN_field_and_method_refs_THEN_their_descriptors_determine_the_stack_effect(self):
+        out = self.pool.add_field_ref("java/lang/System", "out", "Ljava/io/PrintStream;")
+        println = self.pool.add_method_ref("java/io/PrintStream", "println", "(J)V")
+
+        code = [
+            instructions.getstatic(out),
+            instructions.bipush(1),
+            instructions.i2l(),
+            instructions.invokevirtual(println),
+            instructions.voidreturn(),
+        ]
+
+        self.assertEqual(self._analyse(code)[0], 3)
+
+    def test_GIVEN_a_wide_local_variable_index_THEN_max_locals_includes_it(self):
+        code = [instructions.iinc(300, 1), instructions.voidreturn()]
+
+        self.assertEqual(self._analyse(code)[1], 301)
+
+    def test_GIVEN_a_loop_with_a_consistent_stack_THEN_analysis_succeeds(self):
+        code = [
+            instructions.iload(1),      # 0
+            instructions.ifeq(6),       # 1
+            instructions.goto(-4),      # 4
+            instructions.voidreturn(),  # 7
+        ]
+
+        self.assertEqual(self._analyse(code), (1, 2))
+
+    def test_GIVEN_unreachable_code_THEN_it_is_analysed_with_an_empty_stack(self):
+        code = [
+            instructions.goto(4),       # 0
+            instructions.iadd(),        # 3
+            instructions.voidreturn(),  # 4
+        ]
+
+        with self.assertRaises(StackAnalysisError):
+            self._analyse(code)
+
+    def test_GIVEN_paths_joining_with_different_stack_depths_THEN_error(self):
+        code = [
+            instructions.iload(1),      # 0
+            instructions.iload(1),      # 1
+            instructions.ifeq(4),       # 2
+            instructions.iload(1),      # 5
+            instructions.voidreturn(),  # 6
+        ]
+
+        with self.assertRaises(StackAnalysisError):
+            self._analyse(code)
+
+    def test_GIVEN_code_which_pops_an_empty_stack_THEN_error(self):
+        with self.assertRaises(StackAnalysisError):
+            self._analyse([instructions.istore(1), instructions.voidreturn()])
+
+    def test_GIVEN_code_which_can_fall_off_the_end_THEN_error(self):
+        with self.assertRaises(StackAnalysisError):
+            self._analyse([instructions.nop()])
+
+    def test_GIVEN_a_jump_into_the_middle_of_an_instruction_THEN_error(self):
+        with self.assertRaises(StackAnalysisError):
+            self._analyse([instructions.goto(4), instructions.bipush(10), instructions.voidreturn()])
+
+    def test_GIVEN_a_method_descriptor_WHEN_parsing_it_THEN_arguments_and_return_type_are_returned(self):
+        self.assertEqual(parse_method_descriptor("(I[[JLjava/lang/String;D)Ljava/lang/Object;"),
+                         (["I", "[[J", "Ljava/lang/String;", "D"], "Ljava/lang/Object;"))
+
+    def test_GIVEN_a_method_descriptor_THEN_arguments_size_counts_slots_and_this(self):
+        self.assertEqual(arguments_size("(IJ)V", static=True), 3)
+        self.assertEqual(arguments_size("(IJ)V", static=False), 4)
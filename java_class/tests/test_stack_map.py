@@ -0,0 +1,58 @@
+import unittest
+
+from java_class.byte_utils import u1, u2
+from java_class.constant_pool import ConstantPool
+from java_class.constant_pool_entry import class_ref, utf8
+from java_class.stack_map import StackMapFrame, encode_frame, encode_stack_map_table, verification_type, \
+    ITEM_Integer, ITEM_Long, ITEM_Object, FULL_FRAME
+
+
+STRING_ARRAY = "[Ljava/lang/String;"
+
+
+class StackMapTests(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = ConstantPool.generate_default("Test")
+
+    def _encode(self, local_types, stack_types, previous_locals, offset_delta):
+        return encode_frame(self.pool, StackMapFrame(0, local_types, stack_types), previous_locals, offset_delta)
+
+    def test_GIVEN_primitive_types_THEN_they_are_encoded_without_a_class(self):
+        self.assertEqual(verification_type(self.pool, "I"), u1(ITEM_Integer))
+        self.assertEqual(verification_type(self.pool, "C"), u1(ITEM_Integer))
+        self.assertEqual(verification_type(self.pool, "J"), u1(ITEM_Long))
+
+    def test_GIVEN_object_and_array_types_THEN_they_are_encoded_with_a_class_ref(self):
+        string_index = self.pool.get_index(class_ref(self.pool.get_index(utf8("java/lang/String"))))
+        array_index = self.pool.get_index(class_ref(self.pool.get_index(utf8(STRING_ARRAY))))
+
+        self.assertEqual(verification_type(self.pool, "Ljava/lang/String;"), u1(ITEM_Object) + u2(string_index))
+        self.assertEqual(verification_type(self.pool, STRING_ARRAY), u1(ITEM_Object) + u2(array_index))
+
+    def test_GIVEN_same_locals_and_empty_stack_THEN_same_frame_is_used(self):
+        self.assertEqual(self._encode(["I"], [], ["I"], 10), u1(10))
+
+    def test_GIVEN_same_locals_and_empty_stack_and_large_offset_THEN_same_frame_extended_is_used(self):
+        self.assertEqual(self._encode(["I"], [], ["I"], 1000), u1(251) + u2(1000))
+
+    def test_GIVEN_same_locals_and_one_stack_item_THEN_same_locals_1_stack_item_frame_is_used(self):
+        self.assertEqual(self._encode(["I"], ["I"], ["I"], 10), u1(74) + u1(ITEM_Integer))
+
+    def test_GIVEN_locals_added_THEN_append_frame_is_used(self):
+        self.assertEqual(self._encode(["I", "I", "J"], [], ["I"], 10),
+                         u1(253) + u2(10) + u1(ITEM_Integer) + u1(ITEM_Long))
+
+    def test_GIVEN_locals_removed_THEN_chop_frame_is_used(self):
+        self.assertEqual(self._encode(["I"], [], ["I", "I", "I"], 10), u1(249) + u2(10))
+
+    def test_GIVEN_too_many_locals_added_THEN_full_frame_is_used(self):
+        self.assertEqual(self._encode(["I"] * 5, [], [], 10),
+                         u1(FULL_FRAME) + u2(10) + u2(5) + u1(ITEM_Integer) * 5 + u2(0))
+
+    def test_GIVEN_several_frames_THEN_offset_deltas_are_relative_to_the_previous_frame(self):
+        frames = [StackMapFrame(20, [STRING_ARRAY], []), StackMapFrame(5, [STRING_ARRAY], [])]
+
+        table = encode_stack_map_table(self.pool, [STRING_ARRAY], frames)
+
+        self.assertEqual(table, u2(2) + u1(5) + u1(20 - 5 - 1))
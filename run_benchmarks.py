@@ -0,0 +1,186 @@
+import argparse
+import timeit
+
+from intermediate.asl import compact_flatten_ast, flatten_ast
+from java_class import byte_utils
+from java_class.builder import Builder
+from java_class.exporter import Exporter
+from spl.lexer import Lexer
+from spl.parser import Parser
+
+
+def numeral(n):
+    """
+    A unique act/scene numeral for n. The lexer accepts any string of the letters i, v and x as a numeral, so n is
+    simply written in base 3 using those letters.
+    """
+    digits = []
+    while True:
+        n, digit = divmod(n, 3)
+        digits.append("ivx"[digit])
+        if n == 0:
+            return "".join(reversed(digits))
+
+
+def generate_goto_play(scenes):
+    """
+    Generates a play with the given number of scenes, where each scene jumps to another one.
+    """
+    lines = [
+        "A benchmark.",
+        "Romeo, a lord.",
+        "Juliet, a lady.",
+        "Act I: Jumping around.",
+    ]
+
+    for i in range(scenes):
+        lines.extend([
+            "Scene {}: Jumping.".format(numeral(i)),
+            "[Enter Romeo and Juliet]",
+            "Romeo: Am I equal to thyself?",
+            "Juliet: If so, let us proceed to scene {}.".format(numeral((i * 7) % scenes)),
+            "Romeo: Let us proceed to scene {}.".format(numeral((i + 1) % scenes)),
+            "[Exeunt]",
+        ])
+
+    return "\n".join(lines)
+
+
+def compile_play(text):
+    ast = Parser(Lexer(text).token_generator()).play()
+    return Builder("Benchmark").asl_dump(flatten_ast(ast)).build()
+
+
+def encode_all(encoder, values, count=100000):
+    """
+    A callable which encodes count values, cycling through the given ones, with a byte_utils encoder.
+    """
+    values = list(values) * (count // len(values))
+
+    def encode():
+        for value in values:
+            encoder(value)
+    return encode
+
+
+class Benchmarks(object):
+    """
+    Each benchmark does any setup it needs and returns a callable. Only the callable is timed.
+    """
+
+    @staticmethod
+    def goto_resolution():
+        """
+        Resolving the jumps of a play with thousands of scenes and gotos.
+        """
+        builder = Builder("Benchmark").asl_dump(flatten_ast(
+            Parser(Lexer(generate_goto_play(5000)).token_generator()).play()))
+        return lambda: Builder._compute_gotos(builder.code)
+
+    @staticmethod
+    def asl_dump():
+        """
+        Generating the code for the flattened AST of a play with thousands of scenes and gotos.
+        """
+        asl = flatten_ast(Parser(Lexer(generate_goto_play(5000)).token_generator()).play())
+        return lambda: Builder("Benchmark").asl_dump(asl)
+
+    @staticmethod
+    def asl_dump_compact():
+        """
+        Generating the code for the compact ASL of a play with thousands of scenes and gotos.
+        """
+        asl = compact_flatten_ast(Parser(Lexer(generate_goto_play(5000)).token_generator()).play())
+        return lambda: Builder("Benchmark").asl_dump(asl)
+
+    @staticmethod
+    def compile_goto_play():
+        """
+        Compiling a play with thousands of scenes and gotos, from source text to class.
+        """
+        text = generate_goto_play(2000)
+        return lambda: compile_play(text)
+
+    @staticmethod
+    def export_class():
+        """
+        Serialising the class compiled from a play with thousands of scenes and gotos.
+        """
+        cls = compile_play(generate_goto_play(2000))
+        cls.set_version(50, 0)
+        exporter = Exporter(cls)
+        return lambda: exporter.export_to_bytes()
+
+    @staticmethod
+    def encode_u1():
+        """
+        Encoding 100,000 ints with byte_utils.u1.
+        """
+        return encode_all(byte_utils.u1, range(2**8))
+
+    @staticmethod
+    def encode_u2():
+        """
+        Encoding 100,000 ints with byte_utils.u2.
+        """
+        return encode_all(byte_utils.u2, range(0, 2**16, 2**6))
+
+    @staticmethod
+    def encode_u4():
+        """
+        Encoding 100,000 ints with byte_utils.u4.
+        """
+        return encode_all(byte_utils.u4, range(0, 2**32, 2**22))
+
+    @staticmethod
+    def encode_s1():
+        """
+        Encoding 100,000 ints with byte_utils.s1.
+        """
+        return encode_all(byte_utils.s1, range(-2**7, 2**7))
+
+    @staticmethod
+    def encode_s2():
+        """
+        Encoding 100,000 ints with byte_utils.s2.
+        """
+        return encode_all(byte_utils.s2, range(-2**15, 2**15, 2**6))
+
+    @staticmethod
+    def encode_s4():
+        """
+        Encoding 100,000 ints with byte_utils.s4.
+        """
+        return encode_all(byte_utils.s4, range(-2**31, 2**31, 2**22))
+
+    @staticmethod
+    def encode_modified_utf8():
+        """
+        Encoding 100,000 names, some of them not ASCII, with byte_utils.modified_utf8.
+        """
+        names = ["Romeo", "Juliet", "Rom\xe9o", "Juli\xebt", "(I)V", "java/lang/System"]
+        return encode_all(byte_utils.modified_utf8, names)
+
+
+def all_benchmarks():
+    return [name for name in sorted(vars(Benchmarks)) if not name.startswith("_")]
+
+
+if __name__ == "__main__":
+
+    arg_parser = argparse.ArgumentParser(description="Times parts of the compiler.")
+    arg_parser.add_argument("benchmarks", nargs="*", metavar="benchmark",
+                            help="Benchmarks to run, from: {} (default all).".format(", ".join(all_benchmarks())))
+    arg_parser.add_argument("--repeat", type=int, default=3,
+                            help="Number of times to run each benchmark. The fastest time is reported.")
+
+    args = arg_parser.parse_args()
+
+    for name in args.benchmarks:
+        if name not in all_benchmarks():
+            arg_parser.error("Unknown benchmark '{}'.".format(name))
+
+    for name in args.benchmarks or all_benchmarks():
+        statement = getattr(Benchmarks, name)()
+        best = min(timeit.repeat(statement, number=1, repeat=args.repeat))
+        print("{:<30} {:>10.4f}s  {}".format(name, best, getattr(Benchmarks, name).__doc__.strip()))
@@ -18,29 +18,37 @@ def class_name_from_filename(filename):
     return filename.split(".")[0].title()
 
 
-def compile_spl(input_file, class_name):
+def compile_spl(input_file, class_name, **options):
 
-    splbytecode.main(
+    arguments = dict(
         input_file=os.path.join(CODE_DIR, input_file),
         output_dir=os.path.join(TEMP_OUTPUT_DIR),
         cls_name=class_name,
         cls_maj_version=50,
         cls_min_version=0,
     )
+    arguments.update(options)
 
+    splbytecode.main(**arguments)
 
-def run_java(class_name, *args):
+
+def run_java(class_name, *args, stdin=None):
 
     command = ["java", "-cp", TEMP_OUTPUT_DIR, class_name] + [str(a) for a in args]
 
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    input_bytes = stdin.encode() if stdin is not None else b""
     try:
-        output = subprocess.check_output(command, stderr=subprocess.STDOUT, timeout=10)
+        output, _ = process.communicate(input_bytes, timeout=10)
     except TypeError as e:
         if "unexpected keyword argument 'timeout'" not in str(e):
             raise
         # Python 3.2 doesn't support timeout. So try again without one.
-        output = subprocess.check_output(command, stderr=subprocess.STDOUT)
-    
+        output, _ = process.communicate(input_bytes)
+
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, output)
+
     return output.decode()
 
 
@@ -60,13 +68,22 @@ class IntegrationTests(unittest.TestCase):
     asserting that the output is as expected.
     """
 
+    # Extra options passed to the compiler.
+    COMPILER_OPTIONS = {}
+
+    def run_java(self, class_name, *args):
+        """
+        Runs a produced class, giving it the inputs it reads.
+        """
+        return run_java(class_name, *args)
+
     def test_GIVEN_hello_world_example_THEN_it_compiles_and_runs_without_error(self):
         filename = "hello.spl"
         class_name = class_name_from_filename(filename)
 
-        compile_spl(filename, class_name)
+        compile_spl(filename, class_name, **self.COMPILER_OPTIONS)
 
-        output = remove_cr_and_lf(remove_junk_line(run_java(class_name)))
+        output = remove_cr_and_lf(remove_junk_line(self.run_java(class_name)))
 
         self.assertIn("HELLO, WORLD", output)
 
@@ -74,9 +91,9 @@ class IntegrationTests(unittest.TestCase):
         filename = "incrementor.spl"
         class_name = class_name_from_filename(filename)
 
-        compile_spl(filename, class_name)
+        compile_spl(filename, class_name, **self.COMPILER_OPTIONS)
 
-        output = remove_cr_and_lf(remove_junk_line(run_java(class_name, 12321)))
+        output = remove_cr_and_lf(remove_junk_line(self.run_java(class_name, 12321)))
 
         self.assertIn("12322", output)
 
@@ -84,9 +101,9 @@ class IntegrationTests(unittest.TestCase):
         filename = "goto.spl"
         class_name = class_name_from_filename(filename)
 
-        compile_spl(filename, class_name)
+        compile_spl(filename, class_name, **self.COMPILER_OPTIONS)
 
-        output = remove_junk_line(run_java(class_name))
+        output = remove_junk_line(self.run_java(class_name))
 
         self.assertEqual("1" + os.linesep, output)
 
@@ -94,9 +111,9 @@ class IntegrationTests(unittest.TestCase):
         filename = "condgoto.spl"
         class_name = class_name_from_filename(filename)
 
-        compile_spl(filename, class_name)
+        compile_spl(filename, class_name, **self.COMPILER_OPTIONS)
 
-        output = remove_junk_line(run_java(class_name, 15))
+        output = remove_junk_line(self.run_java(class_name, 15))
 
         expected_output = os.linesep.join(str(n) for n in range(1, 16)) + os.linesep
 
@@ -106,7 +123,7 @@ class IntegrationTests(unittest.TestCase):
         filename = "prime.spl"
         class_name = class_name_from_filename(filename)
 
-        compile_spl(filename, class_name)
+        compile_spl(filename, class_name, **self.COMPILER_OPTIONS)
 
         def is_prime(n):
             for divisor in range(2, int(sqrt(n)) + 1):
@@ -115,7 +132,7 @@ class IntegrationTests(unittest.TestCase):
             return True
 
         for n in range(2, 100):
-            output = remove_cr_and_lf(remove_junk_line(run_java(class_name, n)))
+            output = remove_cr_and_lf(remove_junk_line(self.run_java(class_name, n)))
 
             expected_output = "-1" if is_prime(n) else "1"
 
@@ -123,6 +140,114 @@ class IntegrationTests(unittest.TestCase):
                              "failed on n={}, spl says {}, python says {}".format(n, output, is_prime(n)))
 
 
+    def test_GIVEN_arithmetic_example_THEN_it_compiles_and_runs_without_error(self):
+        filename = "arithmetic.spl"
+        class_name = class_name_from_filename(filename)
+
+        compile_spl(filename, class_name, **self.COMPILER_OPTIONS)
+
+        output = remove_junk_line(self.run_java(class_name, 5))
+
+        expected_output = os.linesep.join(["261", "2084", "-2147483648"]) + os.linesep
+
+        self.assertEqual(expected_output, output)
+
+
+class StaticFieldsIntegrationTests(IntegrationTests):
+    """
+    As IntegrationTests, but keeping characters in static fields rather than local variables.
+    """
+    COMPILER_OPTIONS = {"use_static_fields": True}
+
+
+class ModernClassVersionIntegrationTests(IntegrationTests):
+    """
+    As IntegrationTests, but producing class files which must pass the type checking bytecode verifier.
+    """
+    COMPILER_OPTIONS = {"cls_maj_version": 52}
+
+
+class BufferedOutputIntegrationTests(IntegrationTests):
+    """
+    As IntegrationTests, but buffering the output of the produced classes.
+    """
+    COMPILER_OPTIONS = {"buffered_output": True}
+
+    def test_GIVEN_hello_world_example_WHEN_output_is_buffered_THEN_characters_are_printed_without_newlines(self):
+        compile_spl("hello.spl", "Hello", **self.COMPILER_OPTIONS)
+
+        output = remove_junk_line(run_java("Hello"))
+
+        self.assertIn("HELLO, WORLD", output)
+
+
+class StdinInputIntegrationTests(IntegrationTests):
+    """
+    As IntegrationTests, but with the produced classes reading their input from standard in.
+    """
+    COMPILER_OPTIONS = {"stdin_input": True}
+
+    def run_java(self, class_name, *args):
+        return run_java(class_name, stdin="".join("{}\n".format(arg) for arg in args))
+
+    def test_GIVEN_echo_example_WHEN_reading_from_stdin_THEN_characters_are_read_one_at_a_time(self):
+        compile_spl("echo.spl", "Echo", **self.COMPILER_OPTIONS)
+
+        output = remove_junk_line(run_java("Echo", stdin="Hi"))
+
+        self.assertEqual("H" + os.linesep + "i" + os.linesep, output)
+
+
+class SceneCacheIntegrationTests(IntegrationTests):
+    """
+    As IntegrationTests, but caching parsed scenes, so that examples compiled more than once reuse them.
+    """
+    COMPILER_OPTIONS = {"cache_dir": os.path.join(TEMP_OUTPUT_DIR, "cache")}
+
+    def test_GIVEN_prime_test_example_WHEN_compiled_again_from_the_cache_THEN_output_is_the_same(self):
+        outputs = []
+        for class_name in ["PrimeCold", "PrimeWarm"]:
+            compile_spl("prime.spl", class_name, **self.COMPILER_OPTIONS)
+            outputs.append(remove_junk_line(run_java(class_name, 91)))
+
+        self.assertEqual(outputs[0], outputs[1])
+
+
+class OptimisationLevelIntegrationTests(unittest.TestCase):
+    """
+    These tests compile the examples at every optimisation level, and assert that the output of the produced classes
+    is exactly the same.
+    """
+
+    # Examples, and the arguments to run them with.
+    EXAMPLES = [
+        ("hello.spl", []),
+        ("incrementor.spl", [12321]),
+        ("goto.spl", []),
+        ("condgoto.spl", [15]),
+        ("prime.spl", [91]),
+        ("prime.spl", [97]),
+        ("arithmetic.spl", [5]),
+    ]
+
+    def _assert_same_output_at_every_optimisation_level(self, **options):
+        for filename, args in self.EXAMPLES:
+            outputs = []
+            for opt_level in splbytecode.OPT_LEVELS:
+                class_name = "{}O{}".format(class_name_from_filename(filename), opt_level)
+                compile_spl(filename, class_name, opt_level=opt_level, **options)
+                outputs.append(remove_junk_line(run_java(class_name, *args)))
+
+            for output in outputs[1:]:
+                self.assertEqual(outputs[0], output, "output differs for {} with {}".format(filename, args))
+
+    def test_GIVEN_examples_WHEN_compiled_at_each_optimisation_level_THEN_output_is_the_same(self):
+        self._assert_same_output_at_every_optimisation_level()
+
+    def test_GIVEN_examples_WHEN_compiled_at_each_optimisation_level_with_static_fields_THEN_output_is_the_same(self):
+        self._assert_same_output_at_every_optimisation_level(use_static_fields=True)
+
+
 if __name__ == "__main__":
 
     # Clean up any leftover output from previous tests
@@ -132,7 +257,19 @@ if __name__ == "__main__":
 
     loader = unittest.TestLoader()
     runner = unittest.TextTestRunner()
-    suite = loader.loadTestsFromTestCase(IntegrationTests)
-    success = runner.run(suite).wasSuccessful()
-
-    sys.exit(not success)
+    test_classes = [
+        IntegrationTests,
+        StaticFieldsIntegrationTests,
+        ModernClassVersionIntegrationTests,
+        BufferedOutputIntegrationTests,
+        StdinInputIntegrationTests,
+        SceneCacheIntegrationTests,
+        OptimisationLevelIntegrationTests,
+    ]
+
+    ret_vals = []
+    for test_class in test_classes:
+        suite = loader.loadTestsFromTestCase(test_class)
+        ret_vals.append(runner.run(suite).wasSuccessful())
+
+    sys.exit(False in ret_vals)
@@ -1,10 +1,25 @@
 import sys
 import unittest
 
+from intermediate.tests.test_asl import AslTests
+from intermediate.tests.test_compact_asl import CompactAslTests
+from intermediate.tests.test_optimiser import OptimiserTests
+from java_class.tests.test_builder import BuilderTests
+from java_class.tests.test_byte_utils import ByteUtilsTests
 from java_class.tests.test_constant_pool import ConstantPoolTests
+from java_class.tests.test_instructions import InstructionsTests
 from java_class.tests.test_java_class import JavaClassTests
+from java_class.tests.test_peephole import PeepholeTests
+from java_class.tests.test_stack_analysis import StackAnalysisTests
+from java_class.tests.test_stack_map import StackMapTests
+from java_class.tests.test_exporter import ExporterTests
 from spl.tests.test_lexer import LexerTests
 from spl.tests.test_parser import ParserTests
+from spl.tests.test_scene_cache import SceneCacheTests
+from spl.tests.test_stage import StageTests
+from spl.tests.test_tokens import TokenTests
+from spl.tests.test_vocabulary import VocabularyTests
+from spl.tests.test_word_index import WordIndexTests
 
 if __name__ == "__main__":
     loader = unittest.TestLoader()
@@ -13,8 +28,23 @@ if __name__ == "__main__":
     test_classes = [
         ParserTests,
         LexerTests,
+        TokenTests,
+        WordIndexTests,
+        VocabularyTests,
         JavaClassTests,
         ConstantPoolTests,
+        BuilderTests,
+        InstructionsTests,
+        StackAnalysisTests,
+        StackMapTests,
+        ExporterTests,
+        PeepholeTests,
+        ByteUtilsTests,
+        AslTests,
+        OptimiserTests,
+        CompactAslTests,
+        StageTests,
+        SceneCacheTests,
     ]
 
     ret_vals = []
@@ -0,0 +1,18 @@
+import os
+
+
+def replace_file(source, destination):
+    """
+    Renames source to destination, replacing destination if it exists.
+
+    os.replace only exists from Python 3.3, and os.rename won't replace an existing file on Windows, so if renaming
+    fails the destination is removed and the rename is tried again.
+    """
+    try:
+        os.rename(source, destination)
+    except OSError:
+        try:
+            os.remove(destination)
+        except OSError:
+            pass
+        os.rename(source, destination)
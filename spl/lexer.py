@@ -1,123 +1,245 @@
 import re
-import os
-from collections import OrderedDict
+from sys import intern
 
 from intermediate import operators
 from spl.tokens import Token, TokenTypes
+from spl.vocabulary import Vocabulary, WORDS_DIRECTORY, list_from_file
 
 
 FIRST_PERSON_PRONOUNS = ["i ", "myself"]
 SECOND_PERSON_PRONOUNS = ["you", "thyself"]
 
-WORDS_DIRECTORY = os.path.join(os.path.dirname(__file__), "words")
-
-
-def list_from_file(filename):
-    result = []
-    with open(os.path.join(WORDS_DIRECTORY, filename), "r") as f:
-        for line in f.readlines():
-            if line.strip() != "":
-                result.append(line.strip().lower())
-    return sorted(result)  # Ensure consistent order, at least.
+def shared_token(token):
+    """
+    A token factory which always returns the same token. Tokens are never modified once lexed, so tokens without a
+    value specific to the matched text can be shared rather than allocated for each match.
+    """
+    return lambda text: token
 
 
 def regex_from_words(words):
     return "({})".format("|".join(words))
 
 
+def leading_rules():
+    """
+    The lexer rules which take priority over the vocabulary words, in priority order. Each rule is a regex whose
+    first group is the text consumed by the token, and a function building the token from that text.
+    """
+    return [
+        ("(act)",
+            shared_token(Token(TokenTypes.Act))),
+        ("(scene)",
+            shared_token(Token(TokenTypes.Scene))),
+        ("(speak your mind)",
+            shared_token(Token(TokenTypes.Print, True))),
+        ("(open your heart)",
+            shared_token(Token(TokenTypes.Print, False))),
+        ("(open your mind)",
+            shared_token(Token(TokenTypes.Input, True))),
+        ("(listen to your heart)",
+            shared_token(Token(TokenTypes.Input, False))),
+        ("(let us proceed to |let us return to )",
+            lambda text: Token(TokenTypes.Goto, intern(text))),
+    ]
+
+
+def trailing_rules(names):
+    """
+    The lexer rules which are only tried if neither a leading rule nor a vocabulary word matched, in priority order.
+    """
+    return [
+        (regex_from_words(["with", "and"]),
+            shared_token(Token(TokenTypes.Add, operators.Operators.ADD))),
+        (r"(\.|!)",
+            shared_token(Token(TokenTypes.EndLine))),
+        (r"(\?)",
+            shared_token(Token(TokenTypes.QuestionMark))),
+        ("(,)",
+            shared_token(Token(TokenTypes.Comma))),
+        (r"(\[)",
+            shared_token(Token(TokenTypes.OpenSqBracket))),
+        (r"(\])",
+            shared_token(Token(TokenTypes.CloseSqBracket))),
+        ("(:)",
+            shared_token(Token(TokenTypes.Colon))),
+        (regex_from_words(SECOND_PERSON_PRONOUNS),
+            shared_token(Token(TokenTypes.SecondPronoun))),
+        (regex_from_words(FIRST_PERSON_PRONOUNS),
+            shared_token(Token(TokenTypes.FirstPronoun))),
+        ("(enter)",
+            shared_token(Token(TokenTypes.Enter))),
+        ("(exit)",
+            shared_token(Token(TokenTypes.Exit))),
+        ("(exeunt)",
+            shared_token(Token(TokenTypes.Exeunt))),
+        ("(if so)",
+            shared_token(Token(TokenTypes.IfSo))),
+        (" ([ivx]+)[.:]",
+            lambda text: Token(TokenTypes.Numeral, intern(text))),
+        (r"(are|is|am) (?:{0}|{1}|{2}) ?(?:equal to) ?(?:{0}|{1}|{2})\?".format(
+            regex_from_words(FIRST_PERSON_PRONOUNS),
+            regex_from_words(SECOND_PERSON_PRONOUNS),
+            regex_from_words(names)
+            ),
+            shared_token(Token(TokenTypes.QuestionStart))),
+    ]
+
+
+class MasterPattern(object):
+    """
+    All of the lexer rules compiled into a single regex, with one named group per rule.
+
+    Python's regex alternation tries each branch in order, so the first rule (in priority order) which matches at a
+    position wins, exactly as if the rules were tried one by one.
+    """
+
+    _cache = {}
+
+    def __init__(self, rules):
+        self.pattern = re.compile("|".join("(?P<rule{}>{})".format(i, regex) for i, (regex, _) in enumerate(rules)))
+
+        # Maps the index of each rule's outer group to the index of the group holding the consumed text.
+        self.actions = {}
+        for i, (_, factory) in enumerate(rules):
+            group_index = self.pattern.groupindex["rule{}".format(i)]
+            self.actions[group_index] = (group_index + 1, factory)
+
+    @staticmethod
+    def get(rules):
+        """
+        Returns the compiled pattern for the given rules, compiling it only the first time those rules are requested.
+        """
+        key = tuple(regex for regex, _ in rules)
+        try:
+            return MasterPattern._cache[key]
+        except KeyError:
+            master = MasterPattern(rules)
+            MasterPattern._cache[key] = master
+            return master
+
+    def token_at(self, match):
+        """
+        Builds the token for a match of the master pattern, returning it and the number of characters it consumes.
+        """
+        group, factory = self.actions[match.lastindex]
+        text = match.group(group)
+        return factory(text), len(text)
+
+
 class Lexer(object):
-    def __init__(self, text):
-        self.text = text.lower()
-        self.pos = 0
 
-        self.names = list_from_file("characters.txt")
-        self.nouns = list_from_file("nouns.txt")
-        self.negative_nouns = list_from_file("negative_nouns.txt")
-        self.adjectives = list_from_file("adjectives.txt")
+    # Builds the token for a vocabulary word, indexed by the word's class in the vocabulary.
+    WORD_TOKEN_FACTORIES = {
+        Vocabulary.NAMES: lambda text: Token(TokenTypes.Name, intern(text)),
+        Vocabulary.ADJECTIVES: shared_token(Token(TokenTypes.Adj, 2)),
+        Vocabulary.NOUNS: shared_token(Token(TokenTypes.Noun, 1)),
+        Vocabulary.NEGATIVE_NOUNS: shared_token(Token(TokenTypes.Noun, -1)),
+    }
+
+    # Number of characters read from a stream at a time.
+    DEFAULT_CHUNK_SIZE = 64 * 1024
+
+    # Number of characters which must be buffered after the current position before lexing a token from a stream.
+    # No rule needs to look further ahead than this, so tokens which straddle two chunks are lexed correctly.
+    LOOKAHEAD = 1024
+
+    def __init__(self, text, vocabulary=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        :param text: the source code, either as a string or as a text stream (e.g. a file object). Streams are read
+            lazily in chunks as tokens are requested, so the whole source never has to be held in memory.
+        :param vocabulary: the vocabulary to use, or None to use the default word lists
+        :param chunk_size: the number of characters to read from a stream at a time
+        """
+        if isinstance(text, str):
+            self.stream = None
+            self.text = text.lower()
+        else:
+            self.stream = text
+            self.text = ""
+
+        self.chunk_size = max(chunk_size, Lexer.LOOKAHEAD)
+
+        # Position of the next character to lex in self.text. When lexing a stream self.text only holds a window of
+        # the source, and offset is the position of that window in the whole source.
+        self.pos = 0
+        self.offset = 0
+
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary.load()
+        self.names = self.vocabulary.names
+        self.nouns = self.vocabulary.nouns
+        self.negative_nouns = self.vocabulary.negative_nouns
+        self.adjectives = self.vocabulary.adjectives
+
+        self.leading = MasterPattern.get(leading_rules())
+        self.words = self.vocabulary.index
+        self.trailing = MasterPattern.get(trailing_rules(self.names))
+
+    def _fill(self):
+        """
+        Reads more of the stream, if there is one, until at least LOOKAHEAD characters after pos are buffered or the
+        stream is exhausted. Text which has already been lexed is discarded.
+        """
+        if self.stream is None or len(self.text) - self.pos >= Lexer.LOOKAHEAD:
+            return
+
+        chunks = [self.text[self.pos:]]
+        buffered = len(chunks[0])
+        while buffered < Lexer.LOOKAHEAD:
+            chunk = self.stream.read(self.chunk_size)
+            if not chunk:
+                self.stream = None
+                break
+            chunk = chunk.lower()
+            chunks.append(chunk)
+            buffered += len(chunk)
+
+        self.offset += self.pos
+        self.pos = 0
+        self.text = "".join(chunks)
 
     def token_generator(self):
+        self._fill()
         while self.pos < len(self.text):
-            token = self.get_next_token()
-            if token.type is not TokenTypes.NoOp:
+            token, length = self._token_at(self.pos)
+            self.pos += length
+            self._fill()
+            if token is not None:
                 yield token
         yield Token(TokenTypes.Eof)
 
     def get_next_token(self):
-
-        mapping = OrderedDict([
-            ("(act)",
-                lambda: Token(TokenTypes.Act)),
-            ("(scene)",
-                lambda: Token(TokenTypes.Scene)),
-            ("(speak your mind)",
-                lambda: Token(TokenTypes.Print, True)),
-            ("(open your heart)",
-                lambda: Token(TokenTypes.Print, False)),
-            ("(open your mind)",
-                lambda: Token(TokenTypes.Input, True)),
-            ("(listen to your heart)",
-                lambda: Token(TokenTypes.Input, False)),
-            ("(let us proceed to |let us return to )",
-                lambda: Token(TokenTypes.Goto, text)),
-            (regex_from_words(self.names),
-                lambda: Token(TokenTypes.Name, text)),
-            (regex_from_words(self.adjectives),
-                lambda: Token(TokenTypes.Adj, 2)),
-            (regex_from_words(self.nouns),
-                lambda: Token(TokenTypes.Noun, 1)),
-            (regex_from_words(self.negative_nouns),
-                lambda: Token(TokenTypes.Noun, -1)),
-            (regex_from_words(["with", "and"]),
-                lambda: Token(TokenTypes.Add, operators.Operators.ADD)),
-            ("(\.|!)",
-                lambda: Token(TokenTypes.EndLine)),
-            ("(\?)",
-                lambda: Token(TokenTypes.QuestionMark)),
-            ("(,)",
-                lambda: Token(TokenTypes.Comma)),
-            ("(\[)",
-                lambda: Token(TokenTypes.OpenSqBracket)),
-            ("(\])",
-                lambda: Token(TokenTypes.CloseSqBracket)),
-            ("(:)",
-                lambda: Token(TokenTypes.Colon)),
-            ("({})".format("|".join(SECOND_PERSON_PRONOUNS)),
-                lambda: Token(TokenTypes.SecondPronoun)),
-            ("({})".format("|".join(FIRST_PERSON_PRONOUNS)),
-                lambda: Token(TokenTypes.FirstPronoun)),
-            ("(enter)",
-                lambda: Token(TokenTypes.Enter)),
-            ("(exit)",
-                lambda: Token(TokenTypes.Exit)),
-            ("(exeunt)",
-                lambda: Token(TokenTypes.Exeunt)),
-            ("(if so)",
-                lambda: Token(TokenTypes.IfSo)),
-            (" ([ivx]+)[.:]",
-                lambda: Token(TokenTypes.Numeral, text)),
-            ("(are|is|am) (?:{0}|{1}|{2}) ?(?:equal to) ?(?:{0}|{1}|{2})\?".format(
-                regex_from_words(FIRST_PERSON_PRONOUNS),
-                regex_from_words(SECOND_PERSON_PRONOUNS),
-                regex_from_words(self.names)
-                ),
-                lambda: Token(TokenTypes.QuestionStart)),
-        ])
-
-        for regexp in mapping:
-            match, text = self.text_starts_with_regex(regexp)
-            if match:
-                self.pos += len(text)
-                return mapping[regexp]()
-        else:
-            self.pos += 1
-            return Token(TokenTypes.NoOp)
-
-    def text_starts_with_regex(self, rx):
-        regex = "^{}".format(rx)
-        match = re.search(regex, self.text[self.pos:])
-        if match:
-            try:
-                return True, match.group(1)
-            except IndexError:
-                return False, None
-        return False, None
+        self._fill()
+        token, length = self._token_at(self.pos)
+        self.pos += length
+        return token if token is not None else Token(TokenTypes.NoOp)
+
+    def at_end(self):
+        """
+        Whether all of the source has been lexed.
+        """
+        self._fill()
+        return self.pos >= len(self.text)
+
+    def _token_at(self, pos):
+        """
+        Lexes the token starting at text[pos].
+        :return: a tuple (token, number of characters consumed). The token is None if nothing matched at pos, in
+            which case a single character is consumed.
+        """
+        text = self.text
+
+        match = self.leading.pattern.match(text, pos)
+        if match is not None:
+            return self.leading.token_at(match)
+
+        word = self.words.match(text, pos)
+        if word is not None:
+            word_class, length = word
+            return Lexer.WORD_TOKEN_FACTORIES[word_class](text[pos:pos + length]), length
+
+        match = self.trailing.pattern.match(text, pos)
+        if match is not None:
+            return self.trailing.token_at(match)
+
+        return None, 1
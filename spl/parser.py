@@ -1,4 +1,5 @@
 from intermediate import ast, operators
+from spl.stage import Stage
 from spl.tokens import TokenTypes
 
 
@@ -12,9 +13,9 @@ class Parser(object):
         self.current_token = None
         self.next_token()
 
-        self.vars_table = []  # List of variable names declared.
+        self.vars_table = set()  # Set of variable names declared.
 
-        self.onstage = []  # List of characters currently on stage (for figuring out who thyself is...)
+        self.onstage = Stage()  # Characters currently on stage (for figuring out who thyself is...)
         self.speaking = None  # Character currently speaking
         self.current_act = None  # ID of current act. None = not in an act yet.
 
@@ -26,7 +27,7 @@ class Parser(object):
         return self.current_token
 
     def eat(self, token_type):
-        if self.current_token.type == token_type:
+        if self.current_token.type is token_type:
             value = self.current_token.value
             self.next_token()
             return value
@@ -41,12 +42,12 @@ class Parser(object):
         return self.eat(TokenTypes.Adj)
 
     def character_name(self):
-        if self.current_token.type == TokenTypes.Name:
+        if self.current_token.type is TokenTypes.Name:
             return self.eat(TokenTypes.Name)
-        elif self.current_token.type == TokenTypes.SecondPronoun:
+        elif self.current_token.type is TokenTypes.SecondPronoun:
             self.eat(TokenTypes.SecondPronoun)
             return self.get_character_being_spoken_to()
-        elif self.current_token.type == TokenTypes.FirstPronoun:
+        elif self.current_token.type is TokenTypes.FirstPronoun:
             self.eat(TokenTypes.FirstPronoun)
             return self.speaking
         else:
@@ -58,31 +59,48 @@ class Parser(object):
     def get_character_being_spoken_to(self):
         if len(self.onstage) != 2:
             raise SPLSyntaxError("There must be exactly 2 characters on stage to speak to someone")
-        assert self.speaking is not None
-        char = list(c for c in self.onstage if c != self.speaking)
-        assert len(char) == 1
-        return char[0]
+        assert self.speaking in self.onstage
+        return self.onstage.other_character(self.speaking)
+
+    @staticmethod
+    def _balanced_tree(operands, op):
+        """
+        Combines a list of operands with an associative operator into a tree whose depth is logarithmic in the number
+        of operands, so that long expressions don't need deep recursion to process or a deep stack to evaluate.
+        """
+        while len(operands) > 1:
+            pairs = [ast.BinaryOperator(operands[i], op, operands[i + 1]) for i in range(0, len(operands) - 1, 2)]
+            if len(operands) % 2 == 1:
+                pairs.append(operands[-1])
+            operands = pairs
+        return operands[0]
 
     def term(self):
-        if self.current_token.type == TokenTypes.Adj:
-            return ast.BinaryOperator(ast.Value(self.eat(TokenTypes.Adj)), operators.Operators.MULTIPLY, self.term())
-        elif self._is_current_token_character():
-            return ast.DynamicValue(self.character_name())
+        factors = []
+        while self.current_token.type is TokenTypes.Adj:
+            factors.append(ast.Value(self.eat(TokenTypes.Adj)))
+
+        if self._is_current_token_character():
+            factors.append(ast.DynamicValue(self.character_name()))
         else:
-            return ast.Value(self.eat(TokenTypes.Noun))
+            factors.append(ast.Value(self.eat(TokenTypes.Noun)))
+
+        return self._balanced_tree(factors, operators.Operators.MULTIPLY)
 
     def expr(self):
-        left = self.term()
-        if self.current_token.type == TokenTypes.Add:
-            return ast.BinaryOperator(left, self.eat(TokenTypes.Add), self.expr())
-        elif self.current_token.type == TokenTypes.Adj:
-            return ast.BinaryOperator(left, operators.Operators.ADD, self.expr())
-        elif self.current_token.type == TokenTypes.EndLine:
-            self.eat(TokenTypes.EndLine)
-            return left
-        else:
-            op = ast.BinaryOperator(left, operators.Operators.ADD, self.expr())
-            return op
+        """
+        A sum of terms, which are optionally separated by "and", up to the end of the line.
+        """
+        terms = [self.term()]
+        while True:
+            if self.current_token.type is TokenTypes.Add:
+                self.eat(TokenTypes.Add)
+            elif self.current_token.type is TokenTypes.EndLine:
+                self.eat(TokenTypes.EndLine)
+                break
+            terms.append(self.term())
+
+        return self._balanced_tree(terms, operators.Operators.ADD)
 
     def var_assignment(self):
         name = self.eat(TokenTypes.Name)
@@ -91,23 +109,27 @@ class Parser(object):
 
         if name in self.vars_table:
             raise SPLSyntaxError("Redeclaring variables is not allowed ('{}').".format(name))
-        self.vars_table.append(name)
+        self.vars_table.add(name)
         return ast.Assign(name, value, dynamic=False)
 
-    def act(self):
+    def act_header(self):
         self.eat(TokenTypes.Act)
         id = self.eat(TokenTypes.Numeral)
         self.eat(TokenTypes.Colon)
 
-        while self.current_token.type != TokenTypes.EndLine:
+        while self.current_token.type is not TokenTypes.EndLine:
             self.eat(self.current_token.type)
         self.eat(TokenTypes.EndLine)
 
         self.current_act = id
+        return id
+
+    def act(self):
+        id = self.act_header()
 
         children = [self.scene()]
 
-        while self.current_token.type != TokenTypes.Eof and self.current_token.type != TokenTypes.Act:
+        while self.current_token.type is not TokenTypes.Eof and self.current_token.type is not TokenTypes.Act:
             children.append(self.scene())
 
         return ast.Label(name="act {}".format(id), children=children)
@@ -117,15 +139,15 @@ class Parser(object):
         id = self.eat(TokenTypes.Numeral)
         self.eat(TokenTypes.Colon)
 
-        while self.current_token.type != TokenTypes.EndLine:
+        while self.current_token.type is not TokenTypes.EndLine:
             self.eat(self.current_token.type)
         self.eat(TokenTypes.EndLine)
 
         children = []
 
-        while self.current_token.type != TokenTypes.Eof \
-                and self.current_token.type != TokenTypes.Act\
-                and self.current_token.type != TokenTypes.Scene:
+        while self.current_token.type is not TokenTypes.Eof \
+                and self.current_token.type is not TokenTypes.Act\
+                and self.current_token.type is not TokenTypes.Scene:
             children.append(self.statement())
 
         if len(self.onstage) != 0:
@@ -134,7 +156,7 @@ class Parser(object):
         return ast.Label(name="act {} scene {}".format(self.current_act, id), children=children)
 
     def statement(self):
-        if self.current_token.type == TokenTypes.OpenSqBracket:
+        if self.current_token.type is TokenTypes.OpenSqBracket:
             self.stagecontrol()
             return ast.NoOp()
         else:
@@ -142,9 +164,9 @@ class Parser(object):
 
     def stagecontrol(self):
         self.eat(TokenTypes.OpenSqBracket)
-        if self.current_token.type == TokenTypes.Enter:
+        if self.current_token.type is TokenTypes.Enter:
             self.enter()
-        elif self.current_token.type == TokenTypes.Exit:
+        elif self.current_token.type is TokenTypes.Exit:
             self.exit()
         else:
             self.exeunt()
@@ -153,7 +175,7 @@ class Parser(object):
     def enter(self):
         self.eat(TokenTypes.Enter)
         self.enter_single()
-        while self.current_token.type == TokenTypes.Add:
+        while self.current_token.type is TokenTypes.Add:
             self.eat(TokenTypes.Add)
             self.enter_single()
 
@@ -161,12 +183,12 @@ class Parser(object):
         name = self.eat(TokenTypes.Name)
         if name in self.onstage:
             raise SPLSyntaxError("Character '{}' cannot enter as they are already on stage".format(name))
-        self.onstage.append(name)
+        self.onstage.enter(name)
 
     def exit(self):
         self.eat(TokenTypes.Exit)
         self.exit_single()
-        while self.current_token.type == TokenTypes.Add:
+        while self.current_token.type is TokenTypes.Add:
             self.eat(TokenTypes.Add)
             self.exit_single()
 
@@ -174,11 +196,11 @@ class Parser(object):
         name = self.eat(TokenTypes.Name)
         if name not in self.onstage:
             raise SPLSyntaxError("Character '{}' cannot leave if they are not on stage.".format(name))
-        self.onstage.remove(name)
+        self.onstage.exit(name)
 
     def exeunt(self):
         self.eat(TokenTypes.Exeunt)
-        self.onstage = []
+        self.onstage.clear()
 
     def speech(self):
         name = self.eat(TokenTypes.Name)
@@ -190,21 +212,21 @@ class Parser(object):
 
         self.eat(TokenTypes.Colon)
 
-        if self.current_token.type == TokenTypes.Print:
+        if self.current_token.type is TokenTypes.Print:
             as_char = self.eat(TokenTypes.Print)
             statement = ast.PrintVariable(self.get_character_being_spoken_to(), as_char)
             self.eat(TokenTypes.EndLine)
-        elif self.current_token.type == TokenTypes.Input:
+        elif self.current_token.type is TokenTypes.Input:
             as_char = self.eat(TokenTypes.Input)
             statement = ast.InputVariable(self.get_character_being_spoken_to(), as_char)
             self.eat(TokenTypes.EndLine)
-        elif self.current_token.type == TokenTypes.Goto:
+        elif self.current_token.type is TokenTypes.Goto:
             statement = self.goto()
             self.eat(TokenTypes.EndLine)
-        elif self.current_token.type == TokenTypes.IfSo:
+        elif self.current_token.type is TokenTypes.IfSo:
             statement = self.conditional_goto()
             self.eat(TokenTypes.EndLine)
-        elif self.current_token.type == TokenTypes.QuestionStart:
+        elif self.current_token.type is TokenTypes.QuestionStart:
             self.eat(TokenTypes.QuestionStart)
             statement = self.question()
             self.eat(TokenTypes.QuestionMark)
@@ -223,11 +245,11 @@ class Parser(object):
 
     def goto(self):
         self.eat(TokenTypes.Goto)
-        if self.current_token.type == TokenTypes.Act:
+        if self.current_token.type is TokenTypes.Act:
             self.eat(TokenTypes.Act)
             id = self.eat(TokenTypes.Numeral)
             return ast.Goto(name="act {}".format(id))
-        elif self.current_token.type == TokenTypes.Scene:
+        elif self.current_token.type is TokenTypes.Scene:
             self.eat(TokenTypes.Scene)
             id = self.eat(TokenTypes.Numeral)
             return ast.Goto(name="act {} scene {}".format(self.current_act, id))
@@ -238,11 +260,11 @@ class Parser(object):
         self.eat(TokenTypes.IfSo)
         self.eat(TokenTypes.Comma)
         self.eat(TokenTypes.Goto)
-        if self.current_token.type == TokenTypes.Act:
+        if self.current_token.type is TokenTypes.Act:
             self.eat(TokenTypes.Act)
             id = self.eat(TokenTypes.Numeral)
             return ast.ConditionalGoto(name="act {}".format(id))
-        elif self.current_token.type == TokenTypes.Scene:
+        elif self.current_token.type is TokenTypes.Scene:
             self.eat(TokenTypes.Scene)
             id = self.eat(TokenTypes.Numeral)
             return ast.ConditionalGoto(name="act {} scene {}".format(self.current_act, id))
@@ -258,18 +280,26 @@ class Parser(object):
         expr_tree = self.expr()
         return ast.Assign(spoken_to, expr_tree)
 
-    def play(self):
+    def declarations(self):
+        """
+        Parses the title and the characters declared after it, up to the first act.
+        :return: the assignments declaring the characters
+        """
         # Ignore everything up to and including the first full stop.
-        while self.current_token.type != TokenTypes.EndLine:
+        while self.current_token.type is not TokenTypes.EndLine:
             self.next_token()
         self.eat(TokenTypes.EndLine)
 
         children = []
-        while self.current_token.type != TokenTypes.Act:
+        while self.current_token.type is not TokenTypes.Act and self.current_token.type is not TokenTypes.Eof:
             children.append(self.var_assignment())
+        return children
+
+    def play(self):
+        children = self.declarations()
 
         children.append(self.act())
-        while self.current_token.type != TokenTypes.Eof:
+        while self.current_token.type is not TokenTypes.Eof:
             children.append(self.act())
 
         return ast.Label(name="play", children=children)
@@ -0,0 +1,183 @@
+import hashlib
+import io
+import os
+import pickle
+import re
+
+from intermediate import ast
+from spl.file_utils import replace_file
+from spl.lexer import Lexer
+from spl.parser import Parser, SPLSyntaxError
+from spl.tokens import TokenTypes
+from spl.vocabulary import Vocabulary
+
+# Bump this if the AST or the way scenes are parsed changes, so that stale cache entries are never used.
+CACHE_FORMAT_VERSION = 1
+
+# The start of a line beginning with "act" or "scene", i.e. an act or scene header.
+_HEADER = re.compile(r"^[ \t]*(act|scene)", re.IGNORECASE | re.MULTILINE)
+
+
+class SceneCache(object):
+    """
+    An on-disk cache of parsed scenes, with one pickled AST per file.
+
+    Scenes are keyed by a hash of everything their AST depends on: their source text, the act they are in, the
+    characters declared in the play and the vocabulary, so an entry can never be used for a scene it doesn't match.
+    """
+
+    def __init__(self, directory, vocabulary=None):
+        self.directory = directory
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary.load()
+        self.hits = 0
+        self.misses = 0
+        self._directory_exists = False
+
+        words = hashlib.sha256()
+        for word_list in [self.vocabulary.names, self.vocabulary.adjectives, self.vocabulary.nouns,
+                          self.vocabulary.negative_nouns]:
+            words.update("\n".join(word_list).encode("utf-8") + b"\0")
+        self._vocabulary_hash = words.hexdigest()
+
+    def key(self, act, characters, text):
+        """
+        The key of a scene.
+        :param act: the id of the act the scene is in
+        :param characters: the characters declared in the play
+        :param text: the source text of the scene, from its header to the next header
+        """
+        key = (CACHE_FORMAT_VERSION, self._vocabulary_hash, act, sorted(characters), text)
+        return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, "{}.pickle".format(key))
+
+    def load(self, key):
+        """
+        The scene stored with a key, or None if there isn't one.
+        """
+        try:
+            with open(self._path(key), "rb") as f:
+                scene = pickle.load(f)
+        except Exception:
+            # A missing or unreadable entry is just a miss. The scene will be parsed and stored again.
+            scene = None
+
+        if isinstance(scene, ast.Label):
+            self.hits += 1
+            return scene
+        self.misses += 1
+        return None
+
+    def store(self, key, scene):
+        """
+        Stores a scene. Entries are written to a temporary file and then renamed, so that a compilation which is
+        interrupted (or runs concurrently) never leaves a partially written entry behind.
+        """
+        path = self._path(key)
+        temporary_path = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            if not self._directory_exists:
+                if not os.path.isdir(self.directory):
+                    os.makedirs(self.directory)
+                self._directory_exists = True
+
+            with open(temporary_path, "wb") as f:
+                pickle.dump(scene, f, pickle.HIGHEST_PROTOCOL)
+            replace_file(temporary_path, path)
+        except Exception:
+            # The cache is only an optimisation, so failing to write to it (e.g. because the directory is read-only,
+            # the disk is full or the scene can't be pickled) is not an error. The scene will just be a miss next time.
+            try:
+                os.remove(temporary_path)
+            except OSError:
+                pass
+
+
+def split_play(source):
+    """
+    Splits the source of a play at the start of every line beginning with an act or scene header. Streams are read a
+    line at a time, so only one piece is held in memory at once.
+
+    No token spans a line break, so each piece lexes to exactly the tokens it would as part of the whole play.
+    :param source: the source code, either as a string or as a text stream (e.g. a file object)
+    :return: a generator of pieces as (kind, text), where kind is "act" or "scene" for the text from a header up to the
+        next one, or "prelude" for the text before the first header (which is always generated first)
+    """
+    lines = io.StringIO(source) if isinstance(source, str) else source
+
+    kind, piece = "prelude", []
+    for line in lines:
+        match = _HEADER.match(line)
+        if match is not None:
+            yield kind, "".join(piece)
+            kind, piece = match.group(1).lower(), []
+        piece.append(line)
+    yield kind, "".join(piece)
+
+
+def _parser(text, vocabulary):
+    return Parser(Lexer(text, vocabulary).token_generator())
+
+
+def _expect_end(parser):
+    if parser.current_token.type is not TokenTypes.Eof:
+        raise SPLSyntaxError("Unexpected token {} before the next act or scene.".format(parser.current_token))
+
+
+def _parse_pieces(source, cache):
+    pieces = split_play(source)
+    _, prelude = next(pieces)
+
+    parser = _parser(prelude, cache.vocabulary)
+    children = parser.declarations()
+    _expect_end(parser)
+    characters = parser.vars_table
+
+    acts = []
+    for kind, piece in pieces:
+        if kind == "act":
+            parser = _parser(piece, cache.vocabulary)
+            act_id = parser.act_header()
+            _expect_end(parser)
+            acts.append(ast.Label(name="act {}".format(act_id), children=[]))
+            continue
+
+        if not acts:
+            raise SPLSyntaxError("Scenes must be in an act.")
+
+        key = cache.key(act_id, characters, piece)
+        scene = cache.load(key)
+        if scene is None:
+            parser = _parser(piece, cache.vocabulary)
+            parser.vars_table = set(characters)
+            parser.current_act = act_id
+            scene = parser.scene()
+            _expect_end(parser)
+            cache.store(key, scene)
+        acts[-1].children.append(scene)
+
+    if not acts or not all(act.children for act in acts):
+        raise SPLSyntaxError("A play must have at least one act, and every act at least one scene.")
+
+    return ast.Label(name="play", children=children + acts)
+
+
+def parse_play(source, cache):
+    """
+    Parses a play, reusing the ASTs of any of its scenes which are in the cache and adding the others to it.
+
+    The play is split into pieces at its act and scene headers, and each piece is parsed on its own. If that fails
+    (e.g. because a title runs on to a line starting with "act", which is then mistaken for a header) the whole play
+    is parsed as usual instead, so the result (or syntax error) is always the same as without a cache.
+    :param source: the source code, either as a string or as a text stream. Streams are read lazily, and must be
+        seekable so that they can be read again if the whole play has to be parsed.
+    :param cache: the SceneCache to use
+    :return: the ast of the play
+    """
+    try:
+        return _parse_pieces(source, cache)
+    except SPLSyntaxError:
+        if not isinstance(source, str):
+            source.seek(0)
+        return _parser(source, cache.vocabulary).play()
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+
+
+class Stage(object):
+    """
+    The characters on stage, in the order they entered.
+
+    Checking whether a character is on stage, entering and exiting all take constant time regardless of the size of
+    the cast. Whenever exactly two characters are on stage they are kept as a pair, so finding the character being
+    spoken to (the one who isn't speaking) is also constant time.
+    """
+
+    def __init__(self, characters=()):
+        self._characters = OrderedDict()
+        self._pair = None
+        for name in characters:
+            self.enter(name)
+
+    def enter(self, name):
+        """
+        Adds a character, who must not already be on stage.
+        """
+        self._characters[name] = None
+        self._update_pair()
+
+    def exit(self, name):
+        """
+        Removes a character, who must be on stage.
+        """
+        del self._characters[name]
+        self._update_pair()
+
+    def clear(self):
+        self._characters.clear()
+        self._pair = None
+
+    def _update_pair(self):
+        self._pair = tuple(self._characters) if len(self._characters) == 2 else None
+
+    def other_character(self, name):
+        """
+        The character on stage who isn't name, or None unless exactly two characters are on stage.
+        """
+        if self._pair is None:
+            return None
+        first, second = self._pair
+        return second if name == first else first
+
+    def __contains__(self, name):
+        return name in self._characters
+
+    def __len__(self):
+        return len(self._characters)
+
+    def __iter__(self):
+        return iter(self._characters)
@@ -1,9 +1,14 @@
+import io
+import os
 import unittest
 
 from spl.lexer import Lexer
 from spl.tokens import Token, TokenTypes
 
 
+EXAMPLES_DIRECTORY = os.path.join(os.path.dirname(__file__), "..", "..", "examples")
+
+
 class LexerTests(unittest.TestCase):
 
     def _assert_tokens_equal(self, actual, expected):
@@ -102,3 +107,71 @@ class LexerTests(unittest.TestCase):
 
         tokens = [t for t in lexer.token_generator()]
         self._assert_tokens_equal(tokens, expected_tokens)
+
+    def test_GIVEN_two_lexers_WHEN_constructed_THEN_they_share_the_same_compiled_master_patterns(self):
+        first, second = Lexer(""), Lexer("Romeo")
+
+        self.assertIs(first.leading, second.leading)
+        self.assertIs(first.trailing, second.trailing)
+
+    def test_GIVEN_a_name_which_starts_with_another_name_WHEN_tokenizing_THEN_the_longest_name_is_used(self):
+        lexer = Lexer("[Enter Helena]")
+
+        expected_tokens = [
+            Token(TokenTypes.OpenSqBracket),
+            Token(TokenTypes.Enter),
+            Token(TokenTypes.Name, "helena"),
+            Token(TokenTypes.CloseSqBracket),
+            Token(TokenTypes.Eof),
+        ]
+
+        tokens = [t for t in lexer.token_generator()]
+        self._assert_tokens_equal(tokens, expected_tokens)
+
+    def test_GIVEN_text_WHEN_tokenizing_with_get_next_token_THEN_same_tokens_as_token_generator(self):
+        text = "Romeo: You are as stupid as the sum of a big pig and thyself! Juliet: Let us proceed to scene II."
+
+        lexer = Lexer(text)
+        expected_tokens = []
+        while not lexer.at_end():
+            token = lexer.get_next_token()
+            if token.type != TokenTypes.NoOp:
+                expected_tokens.append(token)
+        expected_tokens.append(Token(TokenTypes.Eof))
+
+        tokens = [t for t in Lexer(text).token_generator()]
+        self._assert_tokens_equal(tokens, expected_tokens)
+
+    def test_GIVEN_a_stream_WHEN_tokenizing_THEN_same_tokens_as_when_tokenizing_the_whole_text(self):
+        with open(os.path.join(EXAMPLES_DIRECTORY, "prime.spl")) as f:
+            text = f.read() * 5
+
+        tokens = [t for t in Lexer(io.StringIO(text)).token_generator()]
+        self._assert_tokens_equal(tokens, [t for t in Lexer(text).token_generator()])
+
+    def test_GIVEN_a_stream_WHEN_tokens_straddle_chunk_boundaries_THEN_they_are_tokenized_correctly(self):
+        for padding in range(Lexer.LOOKAHEAD - 20, Lexer.LOOKAHEAD):
+            lexer = Lexer(io.StringIO(" " * padding + "Lady Macbeth: Let us proceed to scene II."),
+                          chunk_size=Lexer.LOOKAHEAD)
+
+            expected_tokens = [
+                Token(TokenTypes.Name, "lady macbeth"),
+                Token(TokenTypes.Colon),
+                Token(TokenTypes.Goto, "let us proceed to "),
+                Token(TokenTypes.Scene),
+                Token(TokenTypes.Numeral, "ii"),
+                Token(TokenTypes.EndLine),
+                Token(TokenTypes.Eof),
+            ]
+
+            tokens = [t for t in lexer.token_generator()]
+            self._assert_tokens_equal(tokens, expected_tokens)
+
+    def test_GIVEN_a_stream_WHEN_tokenizing_THEN_it_is_read_lazily(self):
+        chunk_size = 4 * Lexer.LOOKAHEAD
+        stream = io.StringIO("[Exeunt]" * chunk_size)
+
+        tokens = Lexer(stream, chunk_size=chunk_size).token_generator()
+        next(tokens)
+
+        self.assertEqual(stream.tell(), chunk_size)
@@ -1,9 +1,32 @@
 import unittest
 
+from intermediate import ast, operators
 from spl.parser import Parser, SPLSyntaxError
+from spl.stage import Stage
 from spl.tokens import TokenTypes, Token
 
 
+def _evaluate(node):
+    """
+    Evaluates an expression of constants without recursing, returning (value, depth of the tree).
+    """
+    results = {}
+    stack = [(node, 1)]
+    depth = 0
+    while stack:
+        current, current_depth = stack.pop()
+        depth = max(depth, current_depth)
+        if isinstance(current, ast.Value):
+            results[id(current)] = current.value
+        elif id(current.left) in results and id(current.right) in results:
+            left, right = results[id(current.left)], results[id(current.right)]
+            results[id(current)] = left + right if current.op == operators.Operators.ADD else left * right
+        else:
+            stack.extend([(current, current_depth), (current.left, current_depth + 1),
+                          (current.right, current_depth + 1)])
+    return results[id(node)], depth
+
+
 def _add_scene(tokens):
     tokens.extend([
         Token(TokenTypes.Scene),
@@ -66,7 +89,7 @@ class ParserTests(unittest.TestCase):
 
         parser = Parser(t for t in tokens)
 
-        parser.onstage = ["A", "B"]
+        parser.onstage = Stage(["A", "B"])
         parser.speaking = "A"
 
         self.assertEqual(parser.character_name(), "A")
@@ -79,7 +102,7 @@ class ParserTests(unittest.TestCase):
 
         parser = Parser(t for t in tokens)
 
-        parser.onstage = ["A", "B"]
+        parser.onstage = Stage(["A", "B"])
         parser.speaking = "A"
 
         self.assertEqual(parser.character_name(), "B")
@@ -92,7 +115,7 @@ class ParserTests(unittest.TestCase):
 
         parser = Parser(t for t in tokens)
 
-        parser.onstage = ["A", "B"]
+        parser.onstage = Stage(["A", "B"])
         parser.speaking = "A"
 
         self.assertEqual(parser.character_name(), "C")
@@ -105,7 +128,7 @@ class ParserTests(unittest.TestCase):
 
         parser = Parser(t for t in tokens)
 
-        parser.onstage = ["A", "B"]
+        parser.onstage = Stage(["A", "B"])
         parser.speaking = "A"
 
         with self.assertRaises(SPLSyntaxError):
@@ -135,7 +158,7 @@ class ParserTests(unittest.TestCase):
 
         parser = Parser(t for t in tokens)
 
-        parser.vars_table = ["A"]
+        parser.vars_table = {"A"}
 
         with self.assertRaises(SPLSyntaxError):
             parser.var_assignment()
@@ -219,7 +242,7 @@ class ParserTests(unittest.TestCase):
         ]
 
         parser = Parser(t for t in tokens)
-        parser.onstage = ["A"]
+        parser.onstage = Stage(["A"])
 
         parser.stagecontrol()
 
@@ -247,8 +270,50 @@ class ParserTests(unittest.TestCase):
 
         parser = Parser(t for t in tokens)
 
-        parser.onstage = ["A", "B", "C", "D"]
+        parser.onstage = Stage(["A", "B", "C", "D"])
 
         parser.stagecontrol()
 
-        self.assertEqual(parser.onstage, [])
+        self.assertEqual(list(parser.onstage), [])
+
+    def test_GIVEN_terms_separated_by_and_or_nothing_WHEN_parsing_expression_THEN_they_are_summed(self):
+        tokens = [
+            Token(TokenTypes.Adj, 2),
+            Token(TokenTypes.Adj, 2),
+            Token(TokenTypes.Noun, 1),
+            Token(TokenTypes.Add, operators.Operators.ADD),
+            Token(TokenTypes.Noun, -1),
+            Token(TokenTypes.Adj, 2),
+            Token(TokenTypes.Noun, -1),
+            Token(TokenTypes.EndLine),
+            Token(TokenTypes.Eof),
+        ]
+
+        parser = Parser(t for t in tokens)
+
+        self.assertEqual(_evaluate(parser.expr())[0], 4 - 1 - 2)
+        self.assertIs(parser.current_token.type, TokenTypes.Eof)
+
+    def test_GIVEN_expression_with_100000_terms_WHEN_parsing_THEN_tree_is_balanced(self):
+        terms = 100000
+        tokens = []
+        for i in range(terms):
+            tokens.extend([Token(TokenTypes.Adj, 2)] * (i % 3))
+            tokens.append(Token(TokenTypes.Noun, 1))
+            if i % 2 == 0:
+                tokens.append(Token(TokenTypes.Add, operators.Operators.ADD))
+        tokens.extend([Token(TokenTypes.EndLine), Token(TokenTypes.Eof)])
+
+        parser = Parser(t for t in tokens)
+
+        value, depth = _evaluate(parser.expr())
+        self.assertEqual(value, sum(2 ** (i % 3) for i in range(terms)))
+        self.assertLessEqual(depth, 20)
+
+    def test_GIVEN_expression_without_end_of_line_WHEN_parsing_THEN_syntax_error(self):
+        tokens = [Token(TokenTypes.Noun, 1), Token(TokenTypes.Eof)]
+
+        parser = Parser(t for t in tokens)
+
+        with self.assertRaises(SPLSyntaxError):
+            parser.expr()
@@ -0,0 +1,194 @@
+import io
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from intermediate import ast
+from intermediate.asl import flatten_ast
+from spl.lexer import Lexer
+from spl.parser import Parser, SPLSyntaxError
+from spl.scene_cache import SceneCache, parse_play, split_play
+
+PLAY = """A play.
+
+Romeo, a man.
+Juliet, a lady.
+
+Act I: The first act.
+
+Scene I: Counting.
+[Enter Romeo and Juliet]
+Romeo: You are a big cat!
+Juliet: Open your heart!
+[Exeunt]
+
+Scene II: Jumping.
+[Enter Romeo and Juliet]
+Romeo: Am I equal to thyself?
+Juliet: If so, let us proceed to scene I.
+[Exeunt]
+
+Act II: The second act.
+
+Scene I: Listening.
+[Enter Juliet and Romeo]
+Juliet: Listen to your heart!
+[Exeunt]
+"""
+
+
+def _nodes(play):
+    return [str(node) for node in flatten_ast(play)]
+
+
+class SceneCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertSameAsFullParse(self, text, play):
+        self.assertEqual(_nodes(play), _nodes(Parser(Lexer(text).token_generator()).play()))
+
+    def test_GIVEN_a_play_WHEN_splitting_THEN_it_is_split_at_each_act_and_scene_header(self):
+        pieces = list(split_play(PLAY))
+
+        self.assertTrue(pieces[0][1].endswith("Juliet, a lady.\n\n"))
+        self.assertEqual([kind for kind, _ in pieces], ["prelude", "act", "scene", "scene", "act", "scene"])
+        self.assertEqual("".join(piece for _, piece in pieces), PLAY)
+
+    def test_GIVEN_a_stream_WHEN_splitting_THEN_it_is_split_as_a_string_would_be(self):
+        self.assertEqual(list(split_play(io.StringIO(PLAY))), list(split_play(PLAY)))
+
+    def test_GIVEN_an_empty_cache_WHEN_parsing_THEN_every_scene_is_parsed_and_stored(self):
+        cache = SceneCache(self.directory)
+
+        play = parse_play(PLAY, cache)
+
+        self.assertSameAsFullParse(PLAY, play)
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        self.assertEqual(len(os.listdir(self.directory)), 3)
+
+    def test_GIVEN_a_play_parsed_before_WHEN_parsing_again_THEN_every_scene_comes_from_the_cache(self):
+        parse_play(PLAY, SceneCache(self.directory))
+        cache = SceneCache(self.directory)
+
+        play = parse_play(PLAY, cache)
+
+        self.assertSameAsFullParse(PLAY, play)
+        self.assertEqual((cache.hits, cache.misses), (3, 0))
+
+    def test_GIVEN_one_scene_changed_WHEN_parsing_again_THEN_only_that_scene_is_parsed(self):
+        parse_play(PLAY, SceneCache(self.directory))
+        changed = PLAY.replace("You are a big cat!", "You are a big big cat!")
+        cache = SceneCache(self.directory)
+
+        play = parse_play(changed, cache)
+
+        self.assertSameAsFullParse(changed, play)
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+    def test_GIVEN_different_characters_declared_WHEN_parsing_again_THEN_no_scene_comes_from_the_cache(self):
+        parse_play(PLAY, SceneCache(self.directory))
+        changed = PLAY.replace("Juliet, a lady.", "Juliet, a lady.\nHamlet, a prince.")
+        cache = SceneCache(self.directory)
+
+        parse_play(changed, cache)
+
+        self.assertEqual(cache.hits, 0)
+
+    def test_GIVEN_same_scene_in_another_act_WHEN_parsing_THEN_it_is_not_taken_from_the_other_act(self):
+        scene = "Scene I: Again.\n[Enter Romeo and Juliet]\nRomeo: Let us proceed to scene I.\n[Exeunt]\n"
+        text = "A play.\nRomeo, a man.\nJuliet, a lady.\nAct I: One.\n" + scene + "Act II: Two.\n" + scene
+        cache = SceneCache(self.directory)
+
+        play = parse_play(text, cache)
+
+        self.assertSameAsFullParse(text, play)
+        self.assertEqual(cache.hits, 0)
+
+    def test_GIVEN_a_title_with_a_line_starting_with_act_WHEN_parsing_THEN_the_whole_play_is_parsed_instead(self):
+        text = PLAY.replace("Scene II: Jumping.", "Scene II: Jumping\nactively.")
+
+        play = parse_play(text, SceneCache(self.directory))
+
+        self.assertSameAsFullParse(text, play)
+
+    def test_GIVEN_a_title_with_a_line_starting_with_act_WHEN_parsing_a_stream_THEN_it_is_read_again(self):
+        text = PLAY.replace("Scene II: Jumping.", "Scene II: Jumping\nactively.")
+
+        play = parse_play(io.StringIO(text), SceneCache(self.directory))
+
+        self.assertSameAsFullParse(text, play)
+
+    def test_GIVEN_a_file_WHEN_parsing_twice_THEN_the_second_time_every_scene_comes_from_the_cache(self):
+        path = os.path.join(self.directory, "play.spl")
+        with open(path, "w") as f:
+            f.write(PLAY)
+        cache_directory = os.path.join(self.directory, "cache")
+        for _ in range(2):
+            cache = SceneCache(cache_directory)
+            with open(path) as f:
+                play = parse_play(f, cache)
+
+        self.assertSameAsFullParse(PLAY, play)
+        self.assertEqual(cache.hits, 3)
+
+    def test_GIVEN_a_cache_directory_which_cannot_be_written_to_WHEN_parsing_THEN_scenes_are_still_parsed(self):
+        path = os.path.join(self.directory, "not a directory")
+        with open(path, "w") as f:
+            f.write("")
+        cache = SceneCache(path)
+
+        play = parse_play(PLAY, cache)
+        parse_play(PLAY, cache)
+
+        self.assertSameAsFullParse(PLAY, play)
+        self.assertEqual((cache.hits, cache.misses), (0, 6))
+
+    def test_GIVEN_an_entry_which_cannot_be_replaced_WHEN_storing_THEN_no_temporary_file_is_left(self):
+        cache = SceneCache(self.directory)
+        key = cache.key("i", ["romeo"], "Scene I: Nothing.\n")
+        os.mkdir(os.path.join(self.directory, "{}.pickle".format(key)))
+
+        cache.store(key, ast.Label(name="act i scene i", children=[]))
+
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+    def test_GIVEN_scenes_which_cannot_be_pickled_WHEN_parsing_THEN_they_are_parsed_and_nothing_is_stored(self):
+        def dump(obj, file, protocol=None):
+            file.write(b"partial")
+            raise pickle.PicklingError("Can't pickle this.")
+
+        original_dump = pickle.dump
+        pickle.dump = dump
+        try:
+            cache = SceneCache(self.directory)
+            play = parse_play(PLAY, cache)
+        finally:
+            pickle.dump = original_dump
+
+        self.assertSameAsFullParse(PLAY, play)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_GIVEN_a_syntax_error_in_a_scene_WHEN_parsing_THEN_syntax_error(self):
+        text = PLAY.replace("[Exeunt]\n\nScene II", "\nScene II")
+
+        with self.assertRaises(SPLSyntaxError):
+            parse_play(text, SceneCache(self.directory))
+
+    def test_GIVEN_a_corrupt_cache_entry_WHEN_parsing_THEN_the_scene_is_parsed_again(self):
+        parse_play(PLAY, SceneCache(self.directory))
+        for filename in os.listdir(self.directory):
+            with open(os.path.join(self.directory, filename), "wb") as f:
+                f.write(b"not a pickle")
+        cache = SceneCache(self.directory)
+
+        play = parse_play(PLAY, cache)
+
+        self.assertSameAsFullParse(PLAY, play)
+        self.assertEqual(cache.misses, 3)
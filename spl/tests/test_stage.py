@@ -0,0 +1,50 @@
+import unittest
+
+from spl.stage import Stage
+
+
+class StageTests(unittest.TestCase):
+
+    def test_GIVEN_characters_entering_and_leaving_THEN_those_on_stage_are_in_the_order_they_entered(self):
+        stage = Stage(["romeo", "juliet", "hamlet"])
+
+        stage.exit("juliet")
+        stage.enter("juliet")
+
+        self.assertEqual(list(stage), ["romeo", "hamlet", "juliet"])
+        self.assertIn("hamlet", stage)
+        self.assertEqual(len(stage), 3)
+
+    def test_GIVEN_two_characters_on_stage_WHEN_getting_the_other_character_THEN_it_is_the_one_not_given(self):
+        stage = Stage(["romeo", "juliet"])
+
+        self.assertEqual(stage.other_character("romeo"), "juliet")
+        self.assertEqual(stage.other_character("juliet"), "romeo")
+
+    def test_GIVEN_other_than_two_characters_on_stage_WHEN_getting_the_other_character_THEN_none(self):
+        stage = Stage(["romeo", "juliet", "hamlet"])
+        self.assertIsNone(stage.other_character("romeo"))
+
+        stage.exit("hamlet")
+        self.assertEqual(stage.other_character("romeo"), "juliet")
+
+        stage.exit("juliet")
+        self.assertIsNone(stage.other_character("romeo"))
+
+    def test_GIVEN_characters_on_stage_WHEN_clearing_THEN_noone_is_on_stage(self):
+        stage = Stage(["romeo", "juliet"])
+
+        stage.clear()
+
+        self.assertEqual(list(stage), [])
+        self.assertIsNone(stage.other_character("romeo"))
+
+    def test_GIVEN_a_large_cast_WHEN_entering_and_leaving_THEN_membership_is_kept_up_to_date(self):
+        names = ["character {}".format(i) for i in range(10000)]
+        stage = Stage(names)
+
+        for name in names[::2]:
+            stage.exit(name)
+
+        self.assertEqual(list(stage), names[1::2])
+        self.assertNotIn(names[0], stage)
@@ -0,0 +1,30 @@
+import unittest
+
+from spl.tokens import Token, TokenTypes
+
+
+class TokenTests(unittest.TestCase):
+
+    def test_GIVEN_a_token_type_WHEN_formatted_THEN_its_name_is_used(self):
+        self.assertEqual(str(TokenTypes.Name), "Name")
+        self.assertEqual("{}".format(TokenTypes.Comma), ",")
+
+    def test_GIVEN_token_types_THEN_they_are_distinct_small_integers(self):
+        types = [value for name, value in vars(TokenTypes).items() if not name.startswith("_")]
+
+        self.assertEqual(sorted(types), list(range(len(types))))
+
+    def test_GIVEN_a_token_with_a_value_WHEN_converted_to_string_THEN_type_and_value_are_shown(self):
+        self.assertEqual(str(Token(TokenTypes.Name, "romeo")), "Name: romeo")
+
+    def test_GIVEN_a_token_without_a_value_WHEN_converted_to_string_THEN_only_type_is_shown(self):
+        self.assertEqual(str(Token(TokenTypes.EndLine)), "EndLine")
+
+    def test_GIVEN_two_tokens_of_the_same_type_with_different_values_THEN_they_are_equal(self):
+        self.assertEqual(Token(TokenTypes.Noun, 1), Token(TokenTypes.Noun, -1))
+
+    def test_GIVEN_two_tokens_of_different_types_THEN_they_are_not_equal(self):
+        self.assertNotEqual(Token(TokenTypes.Noun, 1), Token(TokenTypes.Adj, 1))
+
+    def test_GIVEN_a_token_THEN_it_has_no_instance_dictionary(self):
+        self.assertFalse(hasattr(Token(TokenTypes.Eof), "__dict__"))
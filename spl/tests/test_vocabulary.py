@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from spl.vocabulary import Vocabulary, INDEX_FILENAME, list_from_file
+
+
+class VocabularyTests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self._write_words("characters.txt", ["Romeo", "Juliet"])
+        self._write_words("adjectives.txt", ["big"])
+        self._write_words("nouns.txt", ["cat"])
+        self._write_words("negative_nouns.txt", ["pig"])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _write_words(self, filename, words, mtime=None):
+        path = os.path.join(self.directory, filename)
+        with open(path, "w") as f:
+            f.write("\n".join(words))
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+    def test_GIVEN_a_word_list_WHEN_reading_it_THEN_words_are_lower_case_and_sorted(self):
+        self.assertEqual(list_from_file("characters.txt", self.directory), ["juliet", "romeo"])
+
+    def test_GIVEN_a_word_list_WHEN_reading_it_twice_THEN_modifying_the_first_result_does_not_affect_the_second(self):
+        list_from_file("characters.txt", self.directory).append("hamlet")
+
+        self.assertEqual(list_from_file("characters.txt", self.directory), ["juliet", "romeo"])
+
+    def test_GIVEN_a_vocabulary_WHEN_loading_it_twice_THEN_the_same_object_is_returned(self):
+        first = Vocabulary.load(self.directory, use_index_file=False)
+        second = Vocabulary.load(self.directory, use_index_file=False)
+
+        self.assertIs(first, second)
+
+    def test_GIVEN_a_loaded_vocabulary_WHEN_a_word_list_changes_THEN_it_is_reloaded(self):
+        first = Vocabulary.load(self.directory, use_index_file=False)
+
+        self._write_words("nouns.txt", ["cat", "dog"], mtime=os.stat(self.directory).st_mtime + 10)
+        second = Vocabulary.load(self.directory, use_index_file=False)
+
+        self.assertIsNot(first, second)
+        self.assertEqual(second.nouns, ["cat", "dog"])
+        self.assertIn("dog", second.index)
+
+    def test_GIVEN_a_vocabulary_WHEN_loaded_THEN_words_are_indexed_by_class(self):
+        vocabulary = Vocabulary.load(self.directory, use_index_file=False)
+
+        self.assertEqual(vocabulary.index.match("romeo"), (Vocabulary.NAMES, 5))
+        self.assertEqual(vocabulary.index.match("big"), (Vocabulary.ADJECTIVES, 3))
+        self.assertEqual(vocabulary.index.match("cat"), (Vocabulary.NOUNS, 3))
+        self.assertEqual(vocabulary.index.match("pig"), (Vocabulary.NEGATIVE_NOUNS, 3))
+
+    def test_GIVEN_index_file_is_used_WHEN_loading_THEN_index_file_is_written_and_can_be_read_back(self):
+        Vocabulary.load(self.directory)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, INDEX_FILENAME)))
+
+        mtimes = Vocabulary._modification_times(self.directory)
+        vocabulary = Vocabulary._read_index_file(self.directory, mtimes)
+
+        self.assertEqual(vocabulary.names, ["juliet", "romeo"])
+        self.assertEqual(vocabulary.index.match("juliet"), (Vocabulary.NAMES, 6))
+
+    def test_GIVEN_index_file_is_out_of_date_WHEN_reading_it_THEN_it_is_not_used(self):
+        Vocabulary.load(self.directory)
+
+        self._write_words("nouns.txt", ["cat", "dog"], mtime=os.stat(self.directory).st_mtime + 10)
+        mtimes = Vocabulary._modification_times(self.directory)
+
+        self.assertIsNone(Vocabulary._read_index_file(self.directory, mtimes))
+        self.assertEqual(Vocabulary.load(self.directory).nouns, ["cat", "dog"])
+
+    def test_GIVEN_index_file_is_out_of_date_WHEN_loading_THEN_it_is_replaced(self):
+        Vocabulary.load(self.directory)
+        self._write_words("nouns.txt", ["cat", "dog"], mtime=os.stat(self.directory).st_mtime + 10)
+
+        Vocabulary.load(self.directory)
+
+        mtimes = Vocabulary._modification_times(self.directory)
+        self.assertEqual(Vocabulary._read_index_file(self.directory, mtimes).nouns, ["cat", "dog"])
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         sorted([INDEX_FILENAME] + Vocabulary.WORD_CLASSES))
+
+    def test_GIVEN_index_file_cannot_be_written_WHEN_loading_THEN_vocabulary_is_still_loaded(self):
+        os.mkdir(os.path.join(self.directory, INDEX_FILENAME))
+
+        self.assertEqual(Vocabulary.load(self.directory).nouns, ["cat"])
+        self.assertEqual(sorted(os.listdir(self.directory)),
+                         sorted([INDEX_FILENAME] + Vocabulary.WORD_CLASSES))
+
+    def test_GIVEN_index_file_is_corrupt_WHEN_loading_THEN_vocabulary_is_loaded_from_word_lists(self):
+        with open(os.path.join(self.directory, INDEX_FILENAME), "wb") as f:
+            f.write(b"not a pickle")
+
+        self.assertEqual(Vocabulary.load(self.directory).adjectives, ["big"])
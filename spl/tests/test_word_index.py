@@ -0,0 +1,61 @@
+import unittest
+
+from spl.word_index import WordIndex
+
+
+class WordIndexTests(unittest.TestCase):
+
+    def test_GIVEN_an_empty_index_WHEN_matching_THEN_nothing_matches(self):
+        self.assertIsNone(WordIndex().match("romeo"))
+
+    def test_GIVEN_a_word_in_the_index_WHEN_matching_at_its_position_THEN_its_class_and_length_are_returned(self):
+        index = WordIndex()
+        index.add("romeo", "name", 0)
+
+        self.assertEqual(index.match("hello romeo!", 6), ("name", 5))
+
+    def test_GIVEN_a_word_in_the_index_WHEN_matching_at_another_position_THEN_nothing_matches(self):
+        index = WordIndex()
+        index.add("romeo", "name", 0)
+
+        self.assertIsNone(index.match("hello romeo!", 5))
+
+    def test_GIVEN_text_ends_part_way_through_a_word_WHEN_matching_THEN_nothing_matches(self):
+        index = WordIndex()
+        index.add("romeo", "name", 0)
+
+        self.assertIsNone(index.match("rom"))
+
+    def test_GIVEN_two_words_of_the_same_class_WHEN_both_match_THEN_the_longest_wins(self):
+        index = WordIndex()
+        index.add_words(["helen", "helena"], "name", 0)
+
+        self.assertEqual(index.match("helena"), ("name", 6))
+        self.assertEqual(index.match("helens"), ("name", 5))
+
+    def test_GIVEN_two_words_of_different_classes_WHEN_both_match_THEN_the_highest_priority_class_wins(self):
+        index = WordIndex()
+        index.add("cow", "negative noun", 1)
+        index.add("coward", "adjective", 2)
+
+        self.assertEqual(index.match("coward"), ("negative noun", 3))
+
+    def test_GIVEN_a_word_in_two_classes_THEN_the_highest_priority_class_is_kept(self):
+        index = WordIndex()
+        index.add("fat", "noun", 2)
+        index.add("fat", "adjective", 1)
+
+        self.assertEqual(index.match("fat"), ("adjective", 3))
+
+    def test_GIVEN_words_added_THEN_index_contains_exactly_those_words(self):
+        index = WordIndex()
+        index.add_words(["king", "kingdom"], "noun", 0)
+
+        self.assertIn("king", index)
+        self.assertIn("kingdom", index)
+        self.assertNotIn("kin", index)
+        self.assertNotIn("kingdoms", index)
+
+    def test_WHEN_adding_an_empty_word_THEN_value_error(self):
+        with self.assertRaises(ValueError):
+            WordIndex().add("", "noun", 0)
@@ -1,4 +1,6 @@
 class Token(object):
+    __slots__ = ("type", "value")
+
     def __init__(self, type, value=None):
         self.type = type
         self.value = value
@@ -16,29 +18,51 @@ class Token(object):
         return self.type == other.type
 
 
+class TokenType(int):
+    """
+    A token type. These are small integers, so that they are cheap to store and compare, which print as their name.
+
+    There is exactly one instance of each token type, so token types can be compared by identity.
+    """
+    __slots__ = ()
+
+    _names = []
+
+    def __new__(cls, name):
+        token_type = super(TokenType, cls).__new__(cls, len(cls._names))
+        cls._names.append(name)
+        return token_type
+
+    def __str__(self):
+        return TokenType._names[self]
+
+    def __repr__(self):
+        return str(self)
+
+
 class TokenTypes(object):
-    Adj = "Adj"
-    NoOp = "NoOp"
-    Eof = "Eof"
-    Scene = "Scene"
-    Act = "Act"
-    Name = "Name"
-    Noun = "Noun"
-    Add = "Add"
-    EndLine = "EndLine"
-    QuestionMark = "?"
-    Comma = ","
-    Colon = ":"
-    OpenSqBracket = "["
-    CloseSqBracket = "]"
-    SecondPronoun = "SecondPronoun"
-    FirstPronoun = "FirstPronoun"
-    Enter = "Enter"
-    Exit = "Exit"
-    Exeunt = "Exeunt"
-    Print = "Print"
-    Input = "Input"
-    Goto = "Goto"
-    Numeral = "Numeral"
-    IfSo = "IfSo"
-    QuestionStart = "QuestionStart"
+    Adj = TokenType("Adj")
+    NoOp = TokenType("NoOp")
+    Eof = TokenType("Eof")
+    Scene = TokenType("Scene")
+    Act = TokenType("Act")
+    Name = TokenType("Name")
+    Noun = TokenType("Noun")
+    Add = TokenType("Add")
+    EndLine = TokenType("EndLine")
+    QuestionMark = TokenType("?")
+    Comma = TokenType(",")
+    Colon = TokenType(":")
+    OpenSqBracket = TokenType("[")
+    CloseSqBracket = TokenType("]")
+    SecondPronoun = TokenType("SecondPronoun")
+    FirstPronoun = TokenType("FirstPronoun")
+    Enter = TokenType("Enter")
+    Exit = TokenType("Exit")
+    Exeunt = TokenType("Exeunt")
+    Print = TokenType("Print")
+    Input = TokenType("Input")
+    Goto = TokenType("Goto")
+    Numeral = TokenType("Numeral")
+    IfSo = TokenType("IfSo")
+    QuestionStart = TokenType("QuestionStart")
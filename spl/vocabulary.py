@@ -0,0 +1,141 @@
+import os
+import pickle
+
+from spl.file_utils import replace_file
+from spl.word_index import WordIndex
+
+
+WORDS_DIRECTORY = os.path.join(os.path.dirname(__file__), "words")
+
+# Name of the precompiled word index, which is kept next to the word lists it was built from.
+INDEX_FILENAME = "index.pickle"
+
+# Bump this if the format of the precompiled index changes, so that stale index files are rebuilt.
+INDEX_FORMAT_VERSION = 1
+
+# Cache of word lists which have already been read, as {path: (modification time, words)}.
+_word_lists = {}
+
+# Cache of vocabularies which have already been loaded, as {directory: Vocabulary}.
+_vocabularies = {}
+
+
+def _modification_time(path):
+    return os.stat(path).st_mtime
+
+
+def list_from_file(filename, directory=WORDS_DIRECTORY):
+    """
+    Reads a sorted list of lower-case words from a file with one word per line.
+
+    Each file is only read once per process, unless it has been modified since it was last read.
+    """
+    path = os.path.join(directory, filename)
+    mtime = _modification_time(path)
+
+    cached = _word_lists.get(path)
+    if cached is None or cached[0] != mtime:
+        result = []
+        with open(path, "r") as f:
+            for line in f.readlines():
+                if line.strip() != "":
+                    result.append(line.strip().lower())
+        cached = (mtime, tuple(sorted(result)))  # Ensure consistent order, at least.
+        _word_lists[path] = cached
+
+    return list(cached[1])
+
+
+class Vocabulary(object):
+    """
+    The word lists used by the lexer, along with a word index built from them.
+
+    The word classes in the index are the positions of the word lists in WORD_CLASSES, which is also their priority
+    order.
+    """
+
+    # The word list files, in priority order.
+    WORD_CLASSES = ["characters.txt", "adjectives.txt", "nouns.txt", "negative_nouns.txt"]
+
+    NAMES, ADJECTIVES, NOUNS, NEGATIVE_NOUNS = range(len(WORD_CLASSES))
+
+    def __init__(self, directory, word_lists, index, mtimes):
+        self.directory = directory
+        self.names, self.adjectives, self.nouns, self.negative_nouns = word_lists
+        self.index = index
+        self.mtimes = mtimes
+
+    @staticmethod
+    def load(directory=WORDS_DIRECTORY, use_index_file=True):
+        """
+        Loads the vocabulary from a directory of word lists.
+
+        The vocabulary is only loaded once per process, and is reloaded if any of the word lists are modified.
+
+        If use_index_file is True, the word index is read from a precompiled file in the same directory, which is
+        (re)generated if it is missing or older than the word lists.
+        """
+        mtimes = Vocabulary._modification_times(directory)
+
+        vocabulary = _vocabularies.get(directory)
+        if vocabulary is not None and vocabulary.mtimes == mtimes:
+            return vocabulary
+
+        vocabulary = None
+        if use_index_file:
+            vocabulary = Vocabulary._read_index_file(directory, mtimes)
+
+        if vocabulary is None:
+            word_lists = [list_from_file(filename, directory) for filename in Vocabulary.WORD_CLASSES]
+            vocabulary = Vocabulary(directory, word_lists, Vocabulary._build_index(word_lists), mtimes)
+            if use_index_file:
+                vocabulary._write_index_file()
+
+        _vocabularies[directory] = vocabulary
+        return vocabulary
+
+    @staticmethod
+    def _modification_times(directory):
+        return tuple(_modification_time(os.path.join(directory, filename)) for filename in Vocabulary.WORD_CLASSES)
+
+    @staticmethod
+    def _build_index(word_lists):
+        index = WordIndex()
+        for word_class, words in enumerate(word_lists):
+            index.add_words(words, word_class, priority=word_class)
+        return index
+
+    @staticmethod
+    def _read_index_file(directory, mtimes):
+        """
+        Reads a precompiled vocabulary, or returns None if there isn't an up to date one.
+        """
+        try:
+            with open(os.path.join(directory, INDEX_FILENAME), "rb") as f:
+                version, index_mtimes, word_lists, index = pickle.load(f)
+        except Exception:
+            # Missing, unreadable or corrupt index files are regenerated.
+            return None
+
+        if version != INDEX_FORMAT_VERSION or index_mtimes != mtimes:
+            return None
+
+        return Vocabulary(directory, word_lists, index, mtimes)
+
+    def _write_index_file(self):
+        path = os.path.join(self.directory, INDEX_FILENAME)
+        temp_path = "{}.{}.tmp".format(path, os.getpid())
+
+        word_lists = [self.names, self.adjectives, self.nouns, self.negative_nouns]
+        try:
+            with open(temp_path, "wb") as f:
+                pickle.dump((INDEX_FORMAT_VERSION, self.mtimes, word_lists, self.index), f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            replace_file(temp_path, path)
+        except Exception:
+            # The index file is only an optimisation, so failing to write it (e.g. because the install directory is
+            # read-only) is not an error.
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
@@ -0,0 +1,75 @@
+class WordIndex(object):
+    """
+    A trie of words, where each word belongs to a word class (e.g. character names or adjectives).
+
+    Looking up the word at a position in some text walks the trie one character at a time, so it costs O(length of
+    the longest word) regardless of how many words are in the index.
+
+    When several words match at the same position the winner is chosen by these rules, in order:
+     - the word whose class has the highest priority (the lowest priority number) wins
+     - within that class, the longest word wins
+    """
+
+    # Key marking the end of a word in a trie node. Can't clash with the single-character keys used for children.
+    _END = None
+
+    def __init__(self):
+        self._root = {}
+        self.max_length = 0
+
+    def add(self, word, word_class, priority):
+        """
+        Adds a word to the index.
+        :param word: the word to add
+        :param word_class: the value returned by match() when this word is found
+        :param priority: lower numbers take priority when words of several classes match at the same position
+        """
+        if word == "":
+            raise ValueError("Cannot add an empty word to the index.")
+
+        node = self._root
+        for char in word:
+            node = node.setdefault(char, {})
+
+        existing = node.get(WordIndex._END)
+        if existing is None or priority < existing[0]:
+            node[WordIndex._END] = (priority, word_class)
+
+        self.max_length = max(self.max_length, len(word))
+
+    def add_words(self, words, word_class, priority):
+        for word in words:
+            self.add(word, word_class, priority)
+
+    def __contains__(self, word):
+        node = self._root
+        for char in word:
+            node = node.get(char)
+            if node is None:
+                return False
+        return WordIndex._END in node
+
+    def match(self, text, pos=0):
+        """
+        Finds the word starting at text[pos].
+        :return: a tuple (word class, length of the word), or None if no word in the index starts at this position.
+        """
+        best = None
+        best_length = 0
+
+        node = self._root
+        end = min(len(text), pos + self.max_length)
+        i = pos
+        while i < end:
+            node = node.get(text[i])
+            if node is None:
+                break
+            i += 1
+            found = node.get(WordIndex._END)
+            if found is not None and (best is None or found[0] <= best[0]):
+                best = found
+                best_length = i - pos
+
+        if best is None:
+            return None
+        return best[1], best_length
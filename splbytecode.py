@@ -2,23 +2,41 @@ import sys
 import os
 import argparse
 
-from intermediate.asl import flatten_ast
+from intermediate.asl import compact_flatten_ast
+from intermediate.optimiser import fold_constants
 from java_class.builder import Builder, CompilationError
 from java_class.exporter import Exporter
 from spl.lexer import Lexer
 from spl.parser import Parser, SPLSyntaxError
+from spl.scene_cache import SceneCache, parse_play
 
 
-def main(input_file, output_dir, cls_name, cls_maj_version, cls_min_version):
+# Optimisation levels: 0 does no optimisation, 1 folds constant expressions, and 2 also optimises the generated
+# bytecode.
+OPT_LEVELS = [0, 1, 2]
+DEFAULT_OPT_LEVEL = 2
+
+
+def main(input_file, output_dir, cls_name, cls_maj_version, cls_min_version, use_static_fields=False,
+         opt_level=DEFAULT_OPT_LEVEL, buffered_output=False, stdin_input=False, cache_dir=None):
     with open(input_file) as f:
-        spl_lexer = Lexer(f.read())
+        # The file is read lazily as the play is parsed, so parsing has to finish before it is closed.
+        if cache_dir is not None:
+            ast = parse_play(f, SceneCache(cache_dir))
+        else:
+            spl_parser = Parser(Lexer(f).token_generator())
+            ast = spl_parser.play()
 
-    spl_parser = Parser(spl_lexer.token_generator())
+    if opt_level >= 1:
+        ast = fold_constants(ast)
 
-    ast = spl_parser.play()
-    asl = flatten_ast(ast)
+    # The compact ASL takes much less memory than the tree, which can be freed before the code is generated.
+    asl = compact_flatten_ast(ast)
+    del ast
 
-    cls = Builder(cls_name).asl_dump(asl).build()
+    builder = Builder(cls_name, use_static_fields=use_static_fields, optimise=opt_level >= 2,
+                      buffered_output=buffered_output, stdin_input=stdin_input)
+    cls = builder.asl_dump(asl).build()
     cls.set_version(cls_maj_version, cls_min_version)
 
     Exporter(cls).export_as_file(output_dir)
@@ -38,11 +56,27 @@ if __name__ == "__main__":
                             help="Major version number of java output class.", default=50)
     arg_parser.add_argument('--cls-min-version', type=int,
                             help="Minor version number of java output class.", default=0)
+    arg_parser.add_argument('--static-fields', action='store_true',
+                            help="Keep characters in static fields of the output class, rather than in local "
+                                 "variables.")
+    arg_parser.add_argument('--opt-level', type=int, choices=OPT_LEVELS,
+                            help="Optimisation level. 0 disables optimisation, 1 folds constant expressions and 2 "
+                                 "also optimises the generated bytecode.", default=DEFAULT_OPT_LEVEL)
+    arg_parser.add_argument('--buffered-output', action='store_true',
+                            help="Buffer the output of the program, and print characters without a newline after each "
+                                 "one. Much faster for programs which print a lot.")
+    arg_parser.add_argument('--stdin-input', action='store_true',
+                            help="Read input from standard in (numbers one per line, characters one at a time) rather "
+                                 "than from the program's arguments.")
+    arg_parser.add_argument('--cache-dir', type=str,
+                            help="Directory to cache parsed scenes in. Scenes which haven't changed since the last "
+                                 "compilation using the same directory aren't parsed again.", default=None)
 
     args = arg_parser.parse_args()
 
     try:
-        main(args.input, args.output_dir, args.cls_name, args.cls_maj_version, args.cls_min_version)
+        main(args.input, args.output_dir, args.cls_name, args.cls_maj_version, args.cls_min_version,
+             args.static_fields, args.opt_level, args.buffered_output, args.stdin_input, args.cache_dir)
     except SPLSyntaxError as e:
         print("Syntax error: {}".format(e))
         sys.exit(1)